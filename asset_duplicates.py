@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Duplicate and unreferenced asset detector for every asset catalog.
+
+Each target ships its own .xcassets, so the same artwork copied into the
+app, watch and widget catalogs (or twice into one catalog) is compiled by
+actool and shipped once per copy. This scans every image in every catalog
+under the project and reports:
+- groups of byte-identical or pixel-identical images
+- the bytes wasted per target by each copy after the first, even when
+  the copies sit in different targets
+- imagesets whose name no source file, storyboard or plist mentions
+
+Files are hashed in a thread pool, streamed in fixed-size blocks. Only PNGs
+whose dimensions collide with a PNG of different content are decoded; those
+are unfiltered and normalized to 8-bit RGBA in a process pool, so a copy
+re-encoded with another compressor, filter or color type still matches.
+Other formats (JPEG, PDF, HEIC) are compared byte for byte.
+
+The owning target of a catalog is the top-level directory it lives in,
+which is how the MCVenture targets are laid out.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import zlib
+from pathlib import Path
+
+from mcv_common import (
+    GREEN, RED, RESET, YELLOW,
+    make_parser, parse_args, print_header, print_result,
+)
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.heic', '.gif', '.tif', '.tiff', '.pdf', '.svg'}
+SOURCE_SUFFIXES = {'.swift', '.m', '.mm', '.h', '.storyboard', '.xib', '.plist', '.json'}
+SKIP_DIRS = {'build', 'DerivedData', '.git', '.build', 'Pods'}
+
+# Read size for streamed hashing
+HASH_BLOCK = 1024 * 1024
+
+
+class Asset:
+    """One image file inside an asset catalog."""
+
+    __slots__ = ('path', 'target', 'asset_set', 'size', 'digest', 'dimensions', 'match_key')
+
+    def __init__(self, path, target, asset_set):
+        self.path = path
+        self.target = target
+        self.asset_set = asset_set
+        self.size = 0
+        self.digest = None
+        self.dimensions = None
+        self.match_key = None
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in HASH_BLOCK pieces into a reused buffer."""
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_BLOCK)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.digest()
+
+
+def _scan_file(asset):
+    """Thread-pool job: size, content digest and (for PNGs) dimensions."""
+    from png_integrity import read_png_info
+
+    asset.size = os.path.getsize(asset.path)
+    asset.digest = file_digest(asset.path)
+    if asset.path.suffix.lower() == '.png':
+        info = read_png_info(asset.path)
+        if info is not None:
+            asset.dimensions = (info.width, info.height)
+    return asset
+
+
+def _add_bytes(row, prior):
+    """Bytewise (row + prior) mod 256, done on whole rows as big integers."""
+    n = len(row)
+    x = int.from_bytes(row, 'little')
+    y = int.from_bytes(prior, 'little')
+    low = int.from_bytes(b'\x7f' * n, 'little')
+    total = ((x & low) + (y & low)) ^ ((x ^ y) & ~low & ((1 << (8 * n)) - 1))
+    return bytearray(total.to_bytes(n, 'little'))
+
+
+def _unfilter(data, offset, stride, height, bpp):
+    """Undo PNG scanline filters for one image or pass; returns (rows, offset)."""
+    prior = bytearray(stride)
+    rows = []
+    for _ in range(height):
+        kind = data[offset]
+        row = bytearray(data[offset + 1:offset + 1 + stride])
+        offset += 1 + stride
+        if kind == 1:
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:
+            row = _add_bytes(row, prior)
+        elif kind == 3:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prior[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                if i >= bpp:
+                    a, c = row[i - bpp], prior[i - bpp]
+                else:
+                    a = c = 0
+                b = prior[i]
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                row[i] = (row[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        elif kind:
+            raise ValueError(f"Unknown filter type {kind}")
+        rows.append(row)
+        prior = row
+    return rows, offset
+
+
+def _to_rgba(pixels, color_type, palette, transparency):
+    """Convert 8-bit samples of any color type to RGBA bytes."""
+    if color_type == 6:
+        return bytes(pixels)
+    samples = {0: 1, 2: 3, 3: 1, 4: 2}[color_type]
+    count = len(pixels) // samples
+    out = bytearray(count * 4)
+    if color_type == 2:
+        for channel in range(3):
+            out[channel::4] = pixels[channel::3]
+        out[3::4] = b'\xff' * count
+    elif color_type == 0:
+        for channel in range(3):
+            out[channel::4] = pixels
+        out[3::4] = b'\xff' * count
+    elif color_type == 4:
+        for channel in range(3):
+            out[channel::4] = pixels[0::2]
+        out[3::4] = pixels[1::2]
+    else:
+        palette = bytes(palette).ljust(768, b'\0')
+        alpha = bytes(transparency or b'').ljust(256, b'\xff')
+        for channel in range(3):
+            out[channel::4] = bytes(pixels).translate(palette[channel::3])
+        out[3::4] = bytes(pixels).translate(alpha)
+    return bytes(out)
+
+
+def pixel_digest(path):
+    """Digest of a PNG's decoded pixels, or None if it cannot be decoded.
+
+    8-bit images without a color-key tRNS are normalized to RGBA so that
+    color type, palette order, filters and compression do not matter. Other
+    bit depths are hashed as unfiltered samples together with their format.
+    """
+    from png_integrity import ADAM7, COLOR_TYPES, PNG_SIGNATURE, iter_chunks, parse_ihdr
+
+    data = memoryview(Path(path).read_bytes())
+    if data[:len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+        return None
+    try:
+        info = None
+        palette = transparency = b''
+        idat = []
+        for chunk_type, body, _, _ in iter_chunks(data):
+            if chunk_type == b'IHDR':
+                info = parse_ihdr(body)
+            elif chunk_type == b'PLTE':
+                palette = bytes(body)
+            elif chunk_type == b'tRNS':
+                transparency = bytes(body)
+            elif chunk_type == b'IDAT':
+                idat.append(body)
+            elif chunk_type == b'IEND':
+                break
+        if info is None:
+            return None
+        expected = info.expected_data_size()
+        # Never inflate more than one byte past what IHDR promises
+        inflater = zlib.decompressobj()
+        raw = bytearray()
+        for piece in idat:
+            raw += inflater.decompress(piece, expected + 1 - len(raw))
+            if inflater.eof or len(raw) > expected:
+                break
+        if len(raw) != expected:
+            return None
+
+        samples = COLOR_TYPES[info.color_type][0]
+        bpp = max(1, samples * info.bit_depth // 8)
+        if not info.interlace:
+            rows, _ = _unfilter(raw, 0, info.row_bytes(info.width) - 1, info.height, bpp)
+        elif info.bit_depth == 8:
+            rows = [bytearray(info.width * bpp) for _ in range(info.height)]
+            offset = 0
+            for x0, y0, dx, dy in ADAM7:
+                pass_width = (info.width - x0 + dx - 1) // dx
+                pass_height = (info.height - y0 + dy - 1) // dy
+                if not pass_width or not pass_height:
+                    continue
+                pass_rows, offset = _unfilter(raw, offset, pass_width * bpp, pass_height, bpp)
+                for j, row in enumerate(pass_rows):
+                    target = rows[y0 + j * dy]
+                    for channel in range(bpp):
+                        target[x0 * bpp + channel::dx * bpp] = row[channel::bpp]
+        else:
+            # Sub-byte and 16-bit interlaced images are rare in catalogs;
+            # hash their passes as stored.
+            rows = []
+            offset = 0
+            for x0, y0, dx, dy in ADAM7:
+                pass_width = (info.width - x0 + dx - 1) // dx
+                pass_height = (info.height - y0 + dy - 1) // dy
+                if pass_width and pass_height:
+                    pass_rows, offset = _unfilter(
+                        raw, offset, info.row_bytes(pass_width) - 1, pass_height, bpp)
+                    rows.extend(pass_rows)
+    except (ValueError, zlib.error, IndexError):
+        return None
+
+    digest = hashlib.sha256(f"{info.width}x{info.height}:".encode())
+    pixels = b''.join(rows)
+    if info.bit_depth == 8 and not (transparency and info.color_type in (0, 2)):
+        digest.update(b'rgba8:')
+        digest.update(_to_rgba(pixels, info.color_type, palette, transparency))
+    else:
+        digest.update(f"{info.color_type}/{info.bit_depth}/{info.interlace}:".encode())
+        digest.update(palette + b':' + transparency + b':')
+        digest.update(pixels)
+    return digest.digest()
+
+
+def _walk(root):
+    """Yield every file under root, skipping build output and VCS dirs."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS and not entry.name.startswith('.'):
+                    yield from _walk(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path
+
+
+def find_assets(root):
+    """Return (list of Asset, {imageset name: [paths]}) for every catalog under root."""
+    root = Path(root)
+    assets = []
+    imagesets = {}
+    for path in map(Path, _walk(root)):
+        parts = path.relative_to(root).parts
+        catalog = next((i for i, part in enumerate(parts) if part.endswith('.xcassets')), None)
+        if catalog is None or path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        asset_set = path.parent
+        target = parts[0] if catalog else root.name
+        assets.append(Asset(path, target, asset_set))
+        if asset_set.suffix == '.imageset':
+            imagesets.setdefault(asset_set.stem, set()).add(asset_set)
+    return assets, imagesets
+
+
+def scan(assets, jobs=None):
+    """Hash every asset and assign match keys; returns the assets."""
+    from collections import defaultdict
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        list(pool.map(_scan_file, assets))
+
+    # Only PNGs sharing dimensions with different content can be re-encodings
+    by_dimensions = defaultdict(dict)
+    for asset in assets:
+        asset.match_key = asset.digest
+        if asset.dimensions:
+            by_dimensions[asset.dimensions].setdefault(asset.digest, asset.path)
+    to_decode = {digest: path
+                 for variants in by_dimensions.values() if len(variants) > 1
+                 for digest, path in variants.items()}
+
+    if to_decode:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pixels = dict(zip(to_decode, pool.map(pixel_digest, to_decode.values())))
+        for asset in assets:
+            if pixels.get(asset.digest):
+                asset.match_key = b'px:' + pixels[asset.digest]
+    return assets
+
+
+def duplicate_groups(assets):
+    """Return lists of assets sharing a match key, largest waste first."""
+    groups = {}
+    for asset in assets:
+        groups.setdefault(asset.match_key, []).append(asset)
+    duplicates = [sorted(group, key=lambda a: str(a.path))
+                  for group in groups.values() if len(group) > 1]
+    duplicates.sort(key=lambda group: -sum(a.size for a in group[1:]))
+    return duplicates
+
+
+def wasted_bytes(groups):
+    """Bytes per target taken by every copy after the first in its group.
+
+    Copies in other targets count too: each target's catalog is compiled
+    and shipped separately, so only one copy of the artwork is needed.
+    """
+    wasted = {}
+    for group in groups:
+        for asset in group[1:]:
+            wasted[asset.target] = wasted.get(asset.target, 0) + asset.size
+    return wasted
+
+
+def asset_symbol(name):
+    """The Swift symbol Xcode generates for an asset name (MotorcycleLogo -> motorcycleLogo)."""
+    words = [word for word in re.split(r'[^A-Za-z0-9]+', name) if word]
+    if not words:
+        return None
+    symbol = words[0][0].lower() + words[0][1:] + ''.join(w[0].upper() + w[1:] for w in words[1:])
+    return symbol if not symbol[0].isdigit() else '_' + symbol
+
+
+def unreferenced_imagesets(root, imagesets):
+    """Imageset names no source, storyboard, xib or plist mentions."""
+    texts = []
+    for path in _walk(root):
+        if Path(path).suffix in SOURCE_SUFFIXES and '.xcassets' not in path:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    texts.append(f.read())
+            except OSError:
+                continue
+    text = '\n'.join(texts)
+
+    unused = []
+    for name in sorted(imagesets):
+        if f'"{name}"' in text or f'>{name}<' in text:
+            continue
+        symbol = asset_symbol(name)
+        if symbol and re.search(rf'\.{re.escape(symbol)}\b', text):
+            continue
+        unused.append(name)
+    return unused
+
+
+def _size(count):
+    return f"{count / 1024:.1f} KB" if count < 1024 * 1024 else f"{count / 1024 / 1024:.2f} MB"
+
+
+def main(argv=None):
+    parser = make_parser("Find duplicate and unreferenced images across asset catalogs")
+    parser.add_argument('-j', '--jobs', type=int, help="parallel workers (default: per CPU)")
+    args = parse_args(parser, argv)
+
+    print_header("Duplicate Assets")
+    assets, imagesets = find_assets(args.root)
+    scan(assets, args.jobs)
+    groups = duplicate_groups(assets)
+
+    def show(path):
+        return path.relative_to(args.root)
+
+    for group in groups:
+        kind = "identical bytes" if len({a.digest for a in group}) == 1 else "identical pixels"
+        print_result(f"{len(group)} copies of {group[0].path.name} ({kind})", False,
+                     "\n        ".join(f"{show(a.path)} ({_size(a.size)})" for a in group))
+    if not groups:
+        print_result("No duplicate images", True, f"{len(assets)} images checked")
+
+    wasted = wasted_bytes(groups)
+    for target in sorted(wasted):
+        print(f"{YELLOW}{target}: {_size(wasted[target])} in duplicate copies{RESET}")
+    cross = [g for g in groups if len({a.target for a in g}) > 1]
+    if cross:
+        targets = {a.target for group in cross for a in group}
+        print(f"{YELLOW}{len(cross)} group(s) span targets {', '.join(sorted(targets))}; "
+              f"consider a shared catalog{RESET}")
+
+    print_header("Unreferenced Imagesets")
+    unused = unreferenced_imagesets(args.root, imagesets)
+    for name in unused:
+        paths = ", ".join(str(show(p)) for p in sorted(imagesets[name]))
+        print(f"{YELLOW}⚠️  {name}{RESET}\n        {paths}")
+    if not unused:
+        print_result("Every imageset is referenced", True, f"{len(imagesets)} imagesets")
+
+    color = RED if groups else GREEN
+    print(f"\n{color}{len(assets)} images, {len(groups)} duplicate groups, "
+          f"{len(unused)} unreferenced imagesets{RESET}")
+    return 1 if groups else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Multi-destination build matrix for MCVenture.
+
+Builds the iPhone, iPad, macOS, watch and widget destinations concurrently
+with asyncio subprocesses. By default only destinations whose scheme exists
+in the project are built, so the watch and widget entries start building
+once those targets and schemes are added. Each build gets:
+- its own -derivedDataPath, so parallel builds never share intermediates
+- its own timeout; a build that overruns is killed, the others continue
+- cancellation: Ctrl-C or --fail-fast kills every build still running
+Wall time is bounded by the slowest destination rather than the sum.
+
+The xcodebuild binary can be replaced with --xcodebuild or $XCODEBUILD,
+e.g. by tests/fake_xcodebuild.py, which sleeps and exits with a chosen code.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from mcv_common import (
+    BLUE, RESET, YELLOW,
+    make_parser, parse_args, print_header, print_result,
+)
+
+PROJECT_FILE = 'MCVenture.xcodeproj'
+
+# name -> (scheme, xcodebuild -destination)
+DESTINATIONS = {
+    'iphone': ('MCVenture', 'platform=iOS Simulator,name=iPhone 15'),
+    'ipad': ('MCVenture', 'platform=iOS Simulator,name=iPad (10th generation)'),
+    'macos': ('MCVenture', 'platform=macOS,variant=Designed for [iPad,iPhone]'),
+    'watch': ('MCVentureWatch', 'generic/platform=watchOS Simulator'),
+    'widget': ('MCVentureWidgets', 'generic/platform=iOS Simulator'),
+}
+
+DEFAULT_TIMEOUT = 600
+DEFAULT_JOBS = 2
+
+
+@dataclass
+class BuildResult:
+    name: str
+    status: str  # 'passed', 'failed', 'timeout', 'cancelled' or 'error'
+    returncode: Optional[int] = None
+    duration: float = 0.0
+    output: str = field(default='', repr=False)
+
+    @property
+    def passed(self):
+        return self.status == 'passed'
+
+
+async def _stop(proc):
+    """Kill a build and everything it spawned, then reap it.
+
+    xcodebuild's compiler children inherit its stdout; killing only the
+    parent would leave the pipe open until they finish on their own.
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+
+async def run_build(name, scheme, destination, *, project_dir, derived_root,
+                    semaphore, timeout, xcodebuild='xcodebuild'):
+    """Build one destination; never raises except for cancellation."""
+    async with semaphore:
+        derived_data = Path(derived_root) / name
+        derived_data.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            xcodebuild,
+            '-project', PROJECT_FILE,
+            '-scheme', scheme,
+            '-destination', destination,
+            '-derivedDataPath', str(derived_data),
+            'build',
+            '-quiet',
+        ]
+
+        start = time.monotonic()
+        # Shielded so a cancellation arriving mid-spawn still gets the process
+        spawn = asyncio.ensure_future(asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        ))
+        proc = None
+        try:
+            try:
+                proc = await asyncio.shield(spawn)
+            except OSError as e:
+                return BuildResult(name, 'error', output=str(e))
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _stop(proc)
+            return BuildResult(name, 'timeout', proc.returncode, time.monotonic() - start,
+                               f"Timed out after {timeout} seconds")
+        except asyncio.CancelledError:
+            if proc is None:
+                try:
+                    proc = await spawn
+                except OSError:
+                    pass
+            if proc is not None:
+                await _stop(proc)
+            raise
+
+        output = stdout.decode('utf-8', errors='replace')
+        status = 'passed' if proc.returncode == 0 else 'failed'
+        return BuildResult(name, status, proc.returncode, time.monotonic() - start, output)
+
+
+async def run_matrix_async(names, *, project_dir, derived_root, jobs=DEFAULT_JOBS,
+                           timeout=DEFAULT_TIMEOUT, xcodebuild='xcodebuild',
+                           fail_fast=False, destinations=DESTINATIONS):
+    """Build the named destinations concurrently; results keep the input order."""
+    semaphore = asyncio.Semaphore(max(1, jobs))
+    tasks = {
+        asyncio.ensure_future(run_build(
+            name, *destinations[name],
+            project_dir=project_dir,
+            derived_root=derived_root,
+            semaphore=semaphore,
+            timeout=timeout,
+            xcodebuild=xcodebuild,
+        )): name
+        for name in names
+    }
+
+    results = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                result = task.result()
+                results[result.name] = result
+                if fail_fast and not result.passed:
+                    for other in pending:
+                        other.cancel()
+    finally:
+        # Reached on Ctrl-C as well: make sure no xcodebuild outlives us
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for name in names:
+        if name not in results:
+            results[name] = BuildResult(name, 'cancelled')
+    return [results[name] for name in names]
+
+
+def project_schemes(root):
+    """Scheme names the project shares, or its target names if it shares none."""
+    project = Path(root) / PROJECT_FILE
+    schemes = {path.stem for path in (project / 'xcshareddata' / 'xcschemes').glob('*.xcscheme')}
+    if schemes:
+        return schemes
+
+    # Without shared schemes Xcode creates one per target
+    import pbxproj
+    from pbxproj_index import ProjectIndex
+
+    try:
+        with ProjectIndex(project / 'project.pbxproj') as index:
+            return {target.get('name') for target in index.objects('PBXNativeTarget')}
+    except (OSError, pbxproj.PBXParseError):
+        return set()
+
+
+def default_names(root, destinations=DESTINATIONS):
+    """Destinations whose scheme the project has, in table order."""
+    schemes = project_schemes(root)
+    return [name for name, (scheme, _) in destinations.items() if scheme in schemes]
+
+
+def run_matrix(names, **kwargs):
+    """Synchronous wrapper around run_matrix_async."""
+    return asyncio.run(run_matrix_async(names, **kwargs))
+
+
+def report(results, wall_time):
+    """Print per-destination results; returns True when every build passed."""
+    messages = {
+        'passed': "✓ No compilation errors",
+        'failed': "Build failed - check errors",
+        'timeout': "Build timed out",
+        'cancelled': "Cancelled",
+        'error': "Could not start xcodebuild",
+    }
+    for result in results:
+        message = f"{messages[result.status]} ({result.duration:.1f}s)"
+        if result.returncode not in (None, 0):
+            message += f", exit code {result.returncode}"
+        print_result(f"Build {result.name}", result.passed, message)
+        if not result.passed and result.output:
+            print(f"\n{YELLOW}{result.name} output (first 500 chars):{RESET}")
+            print(result.output[:500])
+
+    total = sum(result.duration for result in results)
+    print(f"\n{BLUE}Wall time {wall_time:.1f}s for {total:.1f}s of builds{RESET}")
+    return all(result.passed for result in results)
+
+
+def parse_destination(value):
+    """Parse 'name=scheme:destination' into (name, (scheme, destination))."""
+    name, sep, spec = value.partition('=')
+    scheme, sep2, destination = spec.partition(':')
+    if not (name and sep and scheme and sep2 and destination):
+        raise argparse.ArgumentTypeError(f"expected NAME=SCHEME:DESTINATION, got {value!r}")
+    return name, (scheme, destination)
+
+
+def add_matrix_arguments(parser):
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help=f"concurrent builds (default: {DEFAULT_JOBS})")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f"per-build timeout in seconds (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument('--derived-data',
+                        help="root for per-destination DerivedData (default: <root>/build/matrix)")
+    parser.add_argument('--xcodebuild', default=os.environ.get('XCODEBUILD', 'xcodebuild'),
+                        help="xcodebuild executable (default: $XCODEBUILD or xcodebuild)")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help="cancel remaining builds after the first failure")
+    parser.add_argument('--destination', action='append', default=[], type=parse_destination,
+                        metavar='NAME=SCHEME:DEST',
+                        help="add or override a destination")
+
+
+def matrix_from_args(args, names=None):
+    """Run the matrix described by parsed arguments; returns (results, wall time)."""
+    destinations = dict(DESTINATIONS)
+    destinations.update(args.destination)
+
+    if not names:
+        # Destinations given on the command line are built even without a scheme check
+        names = default_names(args.root, DESTINATIONS)
+        names += [name for name, _ in args.destination if name not in names]
+    derived_root = Path(args.derived_data) if args.derived_data else args.root / 'build' / 'matrix'
+
+    start = time.monotonic()
+    results = run_matrix(
+        names,
+        project_dir=args.root,
+        derived_root=derived_root,
+        jobs=args.jobs,
+        timeout=args.timeout,
+        xcodebuild=args.xcodebuild,
+        fail_fast=args.fail_fast,
+        destinations=destinations,
+    )
+    return results, time.monotonic() - start
+
+
+def main(argv=None):
+    parser = make_parser("Build every destination concurrently")
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help=f"destinations to build, from {', '.join(DESTINATIONS)} "
+                             f"(default: those whose scheme the project has)")
+    add_matrix_arguments(parser)
+    args = parse_args(parser, argv)
+
+    known = set(DESTINATIONS) | {name for name, _ in args.destination}
+    unknown = [name for name in args.names if name not in known]
+    if unknown:
+        parser.error(f"unknown destination(s): {', '.join(unknown)}")
+
+    print_header("Build Matrix")
+    try:
+        results, wall_time = matrix_from_args(args, args.names)
+    except KeyboardInterrupt:
+        print(f"\n{YELLOW}Interrupted - all builds cancelled{RESET}")
+        return 130
+    if not results:
+        print_result("Build matrix", False, "No destination matches a scheme in the project")
+        return 1
+    return 0 if report(results, wall_time) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Effective build settings for every (target, configuration).
+
+Settings are layered the way Xcode does it, lowest first:
+    project xcconfig -> project buildSettings -> target xcconfig -> target buildSettings
+'$(inherited)' pulls in the value from the layer below, and $(VAR) / ${VAR}
+references (with the common :lower, :upper, :rfc1034identifier,
+:c99extidentifier and :default= modifiers) are expanded afterwards.
+Conditional xcconfig assignments such as KEY[sdk=iphoneos*] are ignored.
+
+BuildSettingsResolver memoizes the resolved table, in process and in
+build/build_settings.json, keyed on the mtime and size of project.pbxproj
+and every xcconfig it names, including missing ones. The table is only
+recomputed when one of those files changes, so tools can ask "which
+entitlements does Release use for this target" without rescanning the
+project.
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pbxproj
+from mcv_common import make_parser, parse_args
+
+PROJECT_FILE = Path('MCVenture.xcodeproj') / 'project.pbxproj'
+CACHE_FILE = Path('build') / 'build_settings.json'
+CACHE_VERSION = 1
+
+_VARIABLE = re.compile(r'\$(?:\(([A-Za-z0-9_]+)((?::[^)]*)?)\)|\{([A-Za-z0-9_]+)((?::[^}]*)?)\})')
+_XCCONFIG_LINE = re.compile(r'^\s*([A-Za-z0-9_]+)\s*(\[[^\]]*\])?\s*=\s*(.*?)\s*;?\s*$')
+_INCLUDE = re.compile(r'^\s*#include(\?)?\s+"([^"]+)"')
+_INHERITED = ('$(inherited)', '${inherited}')
+
+
+def _split(value):
+    return value.split() if isinstance(value, str) else list(value)
+
+
+def _inherit(value, lower):
+    """Replace $(inherited) in value with the lower layer's value."""
+    if lower is None:
+        lower = ''
+    if isinstance(value, list):
+        result = []
+        for item in value:
+            if item in _INHERITED:
+                result.extend(_split(lower))
+            else:
+                result.append(item)
+        return result
+    if not any(token in value for token in _INHERITED):
+        return value
+    lower_text = lower if isinstance(lower, str) else ' '.join(lower)
+    for token in _INHERITED:
+        value = value.replace(token, lower_text)
+    return value.strip()
+
+
+def apply_layer(settings, layer, keep_inherited=False):
+    """Overlay one layer of settings, resolving $(inherited) against settings.
+
+    With keep_inherited, $(inherited) in keys settings does not define yet is
+    left in place so it can refer to a lower layer later (xcconfig files).
+    """
+    for key, value in layer.items():
+        if keep_inherited and key not in settings:
+            settings[key] = value
+        else:
+            settings[key] = _inherit(value, settings.get(key))
+    return settings
+
+
+def read_xcconfig(path, inputs, _seen=None):
+    """Parse an xcconfig file (following #include) into a settings layer.
+
+    Every file named is added to inputs, including missing ones, so callers
+    can watch it for changes (a missing file appearing counts as a change).
+    """
+    path = Path(path)
+    seen = _seen if _seen is not None else set()
+    if path in seen:
+        return {}
+    seen.add(path)
+    inputs.append(path)
+
+    try:
+        text = path.read_text(encoding='utf-8')
+    except OSError:
+        return {}
+
+    layer = {}
+    for line in text.splitlines():
+        include = _INCLUDE.match(line)
+        if include:
+            included = read_xcconfig(path.parent / include.group(2), inputs, seen)
+            apply_layer(layer, included, keep_inherited=True)
+            continue
+        line = line.split('//', 1)[0]
+        match = _XCCONFIG_LINE.match(line)
+        if match and not match.group(2):
+            apply_layer(layer, {match.group(1): match.group(3)}, keep_inherited=True)
+    return layer
+
+
+def _modify(value, modifiers):
+    for modifier in filter(None, modifiers.split(':')):
+        name, _, argument = modifier.partition('=')
+        if name == 'lower':
+            value = value.lower()
+        elif name == 'upper':
+            value = value.upper()
+        elif name == 'rfc1034identifier':
+            value = re.sub(r'[^A-Za-z0-9.-]', '-', value)
+        elif name in ('c99extidentifier', 'identifier'):
+            value = re.sub(r'[^A-Za-z0-9_]', '_', value)
+        elif name == 'default' and not value:
+            value = argument
+        elif name == 'base':
+            value = os.path.splitext(os.path.basename(value))[0]
+        elif name == 'dir':
+            value = os.path.dirname(value)
+        elif name == 'file':
+            value = os.path.basename(value)
+    return value
+
+
+def expand_all(settings):
+    """Expand variable references in every value; undefined names become ''."""
+    resolved = {}
+    active = set()
+
+    def lookup(name):
+        if name in resolved:
+            return resolved[name]
+        if name in active or name not in settings:
+            return ''
+        active.add(name)
+        value = settings[name]
+        value = ' '.join(expand(v) for v in value) if isinstance(value, list) else expand(value)
+        active.discard(name)
+        resolved[name] = value
+        return value
+
+    def expand(text):
+        if '$' not in text:
+            return text
+        return _VARIABLE.sub(
+            lambda m: _modify(lookup(m.group(1) or m.group(3)), m.group(2) or m.group(4) or ''),
+            text,
+        )
+
+    result = {}
+    for key, value in settings.items():
+        result[key] = [expand(v) for v in value] if isinstance(value, list) else lookup(key)
+    return result
+
+
+def _config_lists(objects, list_id):
+    config_list = objects.get(list_id, {})
+    for config_id in config_list.get('buildConfigurations', []):
+        config = objects.get(config_id)
+        if isinstance(config, dict):
+            yield config.get('name', config_id), config
+
+
+def _xcconfig_path(config, objects, paths, project_dir):
+    """Path of a configuration's base xcconfig, or None."""
+    ref = config.get('baseConfigurationReference')
+    if ref and ref in paths:
+        return project_dir / paths[ref]
+    anchor = config.get('baseConfigurationReferenceAnchor')
+    relative = config.get('baseConfigurationReferenceRelativePath')
+    if anchor and relative and anchor in paths:
+        return project_dir / paths[anchor] / relative
+    return None
+
+
+def resolve_project(project, project_dir):
+    """Resolve a parsed project; returns ({target: {config: settings}}, xcconfig inputs)."""
+    project_dir = Path(project_dir)
+    objects = project['objects']
+    root = objects[project['rootObject']]
+    paths = pbxproj.reference_paths(project)
+    inputs = []
+    xcconfig_cache = {}
+
+    def xcconfig_layer(config):
+        path = _xcconfig_path(config, objects, paths, project_dir)
+        if path is None:
+            return {}
+        if path not in xcconfig_cache:
+            xcconfig_cache[path] = read_xcconfig(path, inputs)
+        return xcconfig_cache[path]
+
+    project_configs = dict(_config_lists(objects, root.get('buildConfigurationList')))
+
+    table = {}
+    for target_id in root.get('targets', []):
+        target = objects.get(target_id, {})
+        target_name = target.get('name', target_id)
+        for config_name, config in _config_lists(objects, target.get('buildConfigurationList')):
+            settings = {
+                'PROJECT_NAME': PROJECT_FILE.parent.stem,
+                'PROJECT_DIR': str(project_dir),
+                'SRCROOT': str(project_dir),
+                'TARGET_NAME': target_name,
+                'CONFIGURATION': config_name,
+            }
+            project_config = project_configs.get(config_name, {})
+            apply_layer(settings, xcconfig_layer(project_config))
+            apply_layer(settings, project_config.get('buildSettings', {}))
+            apply_layer(settings, xcconfig_layer(config))
+            apply_layer(settings, config.get('buildSettings', {}))
+            table.setdefault(target_name, {})[config_name] = expand_all(settings)
+    return table, inputs
+
+
+def _stamp(paths):
+    stamp = {}
+    for path in paths:
+        try:
+            info = os.stat(path)
+        except OSError:
+            stamp[str(path)] = None
+        else:
+            stamp[str(path)] = [info.st_mtime_ns, info.st_size]
+    return stamp
+
+
+class BuildSettingsResolver:
+    """Memoized effective build settings for one project directory."""
+
+    def __init__(self, root, cache_file=CACHE_FILE):
+        self.root = Path(root)
+        self.project_path = self.root / PROJECT_FILE
+        self.cache_path = self.root / cache_file if cache_file else None
+        self._table = None
+        self._stamp = None
+
+    def _fresh(self, stamp):
+        return stamp is not None and _stamp(stamp) == stamp
+
+    def _load_cache(self):
+        if self.cache_path is None:
+            return False
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('version') != CACHE_VERSION or not self._fresh(cached.get('inputs')):
+            return False
+        self._table, self._stamp = cached['table'], cached['inputs']
+        return True
+
+    def _save_cache(self):
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'inputs': self._stamp, 'table': self._table}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
+
+    def table(self):
+        """Return {target: {configuration: settings}}, recomputing only on change."""
+        if self._fresh(self._stamp) or self._load_cache():
+            return self._table
+        # Stamp before reading so a change made mid-resolve forces a redo
+        before = _stamp([self.project_path])
+        project = pbxproj.load(self.project_path)
+        self._table, inputs = resolve_project(project, self.root)
+        self._stamp = {**before, **_stamp(inputs)}
+        self._save_cache()
+        return self._table
+
+    def targets(self):
+        return list(self.table())
+
+    def settings(self, target, configuration):
+        """Effective settings for one target and configuration, or {}."""
+        return self.table().get(target, {}).get(configuration, {})
+
+    def get(self, target, configuration, key, default=None):
+        return self.settings(target, configuration).get(key, default)
+
+
+def main(argv=None):
+    parser = make_parser("Show effective build settings per target and configuration")
+    parser.add_argument('keys', nargs='*', metavar='KEY', help="settings to show (default: all)")
+    parser.add_argument('-t', '--target', help="only this target")
+    parser.add_argument('-c', '--configuration', help="only this configuration")
+    parser.add_argument('--json', action='store_true', help="print the table as JSON")
+    args = parse_args(parser, argv)
+
+    try:
+        table = BuildSettingsResolver(args.root).table()
+    except (OSError, pbxproj.PBXParseError) as e:
+        print(f"❌ Cannot resolve build settings: {e}", file=sys.stderr)
+        return 1
+
+    selected = {}
+    for target, configs in table.items():
+        if args.target and target != args.target:
+            continue
+        for config, settings in configs.items():
+            if args.configuration and config != args.configuration:
+                continue
+            if args.keys:
+                settings = {key: settings[key] for key in args.keys if key in settings}
+            selected.setdefault(target, {})[config] = settings
+
+    if args.json:
+        json.dump(selected, sys.stdout, indent=2, sort_keys=True)
+        print()
+        return 0
+
+    for target, configs in selected.items():
+        for config, settings in configs.items():
+            print(f"{target} ({config})")
+            for key in sorted(settings):
+                value = settings[key]
+                print(f"    {key} = {' '.join(value) if isinstance(value, list) else value}")
+    return 0 if selected else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,11 +5,13 @@ Automatically configure CloudKit in MCVenture Xcode project
 
 import os
 import sys
-import uuid
 import re
 
+from mcv_common import make_parser, parse_args
+
 def generate_uuid():
     """Generate unique ID for Xcode objects"""
+    import uuid
     return ''.join(str(uuid.uuid4()).upper().split('-'))[:24]
 
 def backup_project(project_path):
@@ -43,11 +45,29 @@ def add_entitlements_to_project(project_path, entitlements_path):
     replacement = r'\1\n\t\t\t\t' + file_ref_uuid + ' /* MCVenture.entitlements */,'
     content = re.sub(group_pattern, replacement, content, count=1)
     
-    # Add CODE_SIGN_ENTITLEMENTS to build configuration
-    # Find XCBuildConfiguration sections for MCVenture target
-    build_settings_pattern = r'(buildSettings = \{[^}]*ASSETCATALOG_COMPILER_APPICON_NAME[^}]*)(PRODUCT_BUNDLE_IDENTIFIER = com\.mc\.no\.MCVenture;)'
-    replacement = r'\1CODE_SIGN_ENTITLEMENTS = MCVenture/MCVenture.entitlements;\n\t\t\t\t\2'
-    content = re.sub(build_settings_pattern, replacement, content)
+    # Add CODE_SIGN_ENTITLEMENTS to every app configuration that builds
+    # com.mc.no.MCVenture and does not already resolve to an entitlements file
+    # (directly, through an xcconfig or from the project level)
+    import pbxproj
+    from build_settings import resolve_project
+
+    project = pbxproj.loads(content)
+    objects = project['objects']
+    table, _ = resolve_project(project, os.path.dirname(os.path.dirname(project_path)))
+    for target_id in objects[project['rootObject']].get('targets', []):
+        target = objects[target_id]
+        if target.get('productType') != 'com.apple.product-type.application':
+            continue
+        resolved = table.get(target.get('name'), {})
+        config_list = objects[target['buildConfigurationList']]
+        for config_id in config_list.get('buildConfigurations', []):
+            config = objects[config_id]
+            settings = resolved.get(config.get('name'), {})
+            if (settings.get('PRODUCT_BUNDLE_IDENTIFIER') == 'com.mc.no.MCVenture'
+                    and not settings.get('CODE_SIGN_ENTITLEMENTS')):
+                config.setdefault('buildSettings', {})['CODE_SIGN_ENTITLEMENTS'] = \
+                    'MCVenture/MCVenture.entitlements'
+    content = pbxproj.dumps(project)
     
     # Write back
     with open(project_path, 'w') as f:
@@ -77,9 +97,11 @@ def add_icloud_capability(project_path):
     
     return False
 
-def main():
+def main(argv=None):
+    args = parse_args(make_parser("Add the entitlements file to the Xcode project"), argv)
+
     # Paths
-    project_dir = '/Users/bntf/Desktop/MCVenture'
+    project_dir = str(args.root)
     project_path = os.path.join(project_dir, 'MCVenture.xcodeproj/project.pbxproj')
     entitlements_path = os.path.join(project_dir, 'MCVenture/MCVenture.entitlements')
     
@@ -89,11 +111,11 @@ def main():
     # Check files exist
     if not os.path.exists(project_path):
         print(f"❌ Error: Project file not found at {project_path}")
-        sys.exit(1)
+        return 1
     
     if not os.path.exists(entitlements_path):
         print(f"❌ Error: Entitlements file not found at {entitlements_path}")
-        sys.exit(1)
+        return 1
     
     # Backup project
     backup_path = backup_project(project_path)
@@ -136,7 +158,9 @@ def main():
         import shutil
         shutil.copy2(backup_path, project_path)
         print("✅ Project restored from backup")
-        sys.exit(1)
+        return 1
+
+    return 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
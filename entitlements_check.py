@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Cross-target entitlements and Info.plist consistency checker.
+
+Every target's CODE_SIGN_ENTITLEMENTS and INFOPLIST_FILE build settings come
+from the memoized build_settings.BuildSettingsResolver, for every build
+configuration; only the target objects are read from the project, through
+ProjectIndex, for their product types. A target's role follows from its
+product type and resolved SDKROOT / SUPPORTED_PLATFORMS (a watch app is an
+application built for watchOS), and a widget is an extension whose
+Info.plist names the WidgetKit extension point. Each referenced file is read
+once and parsed with plistlib (XML or binary); parsed dictionaries are
+cached by content hash, so identical files are parsed once and adding rules
+never adds reads. The rules then cross-check that the app, watch and widget
+targets agree on iCloud containers and services.
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+import pbxproj
+from build_settings import BuildSettingsResolver
+from mcv_common import (
+    GREEN, RED, RESET,
+    make_parser, parse_args, print_header, print_result,
+)
+from pbxproj_index import ProjectIndex
+
+ICLOUD_CONTAINERS = 'com.apple.developer.icloud-container-identifiers'
+ICLOUD_SERVICES = 'com.apple.developer.icloud-services'
+UBIQUITY_CONTAINERS = 'com.apple.developer.ubiquity-container-identifiers'
+
+# productType -> role used by the cross-target rules, refined by TargetConfig.role
+TARGET_ROLES = {
+    'com.apple.product-type.application': 'app',
+    'com.apple.product-type.application.watchapp2': 'watch',
+    'com.apple.product-type.application.watchapp2-container': 'app',
+    'com.apple.product-type.watchkit2-extension': 'watch',
+    'com.apple.product-type.app-extension': 'extension',
+    'com.apple.product-type.extensionkit-extension': 'extension',
+}
+
+WATCH_PLATFORMS = {'watchos', 'watchsimulator'}
+WIDGET_EXTENSION_POINT = 'com.apple.widgetkit-extension'
+
+_VARIABLE = re.compile(r'\$[({]([A-Za-z0-9_]+)(?::[^)}]*)?[)}]')
+
+
+class PlistCache:
+    """Reads each plist once and parses each distinct content once."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.reads = 0
+        self._by_path = {}
+        self._by_digest = {}
+
+    def load(self, relative_path):
+        """Return (dict or None, error message or None) for a project-relative path."""
+        path = (self.root / relative_path).resolve()
+        if path in self._by_path:
+            return self._by_path[path]
+
+        try:
+            data = path.read_bytes()
+        except OSError as e:
+            result = (None, f"Cannot read {relative_path}: {e.strerror}")
+        else:
+            self.reads += 1
+            digest = hashlib.sha256(data).digest()
+            if digest not in self._by_digest:
+                self._by_digest[digest] = _parse_plist(data, relative_path)
+            result = self._by_digest[digest]
+
+        self._by_path[path] = result
+        return result
+
+
+def _parse_plist(data, name):
+    import plistlib
+
+    try:
+        value = plistlib.loads(data)
+    except Exception as e:
+        return None, f"Cannot parse {name}: {e}"
+    if not isinstance(value, dict):
+        return None, f"{name} is not a dictionary plist"
+    return value, None
+
+
+def expand(value, settings):
+    """Expand $(VAR) and ${VAR} references from build settings."""
+    if not isinstance(value, str) or '$' not in value:
+        return value
+    return _VARIABLE.sub(lambda m: str(settings.get(m.group(1), m.group(0))), value)
+
+
+class TargetConfig:
+    """One (target, configuration) pair with its entitlements and Info.plist."""
+
+    __slots__ = ('target', 'product_type', 'configuration', 'settings',
+                 'entitlements_path', 'entitlements', 'info_path', 'info')
+
+    def __init__(self, target, product_type, configuration, settings):
+        self.target = target
+        self.product_type = product_type
+        self.configuration = configuration
+        self.settings = settings
+        self.entitlements_path = settings.get('CODE_SIGN_ENTITLEMENTS')
+        self.info_path = settings.get('INFOPLIST_FILE')
+        self.entitlements = None
+        self.info = None
+
+    @property
+    def label(self):
+        return f"{self.target} ({self.configuration})"
+
+    @property
+    def bundle_id(self):
+        return self.settings.get('CFBundleIdentifier')
+
+    @property
+    def role(self):
+        """'app', 'watch', 'widget', 'extension' or 'other'.
+
+        Since Xcode 14 a watch app is a plain application built for watchOS,
+        so the platform decides; widgets are told apart from other
+        extensions by the extension point in their Info.plist.
+        """
+        role = TARGET_ROLES.get(self.product_type, 'other')
+        if role == 'app' and self.platform_is_watch():
+            return 'watch'
+        if role == 'extension' and isinstance(self.info, dict):
+            extension = self.info.get('NSExtension')
+            if isinstance(extension, dict) and \
+                    extension.get('NSExtensionPointIdentifier') == WIDGET_EXTENSION_POINT:
+                return 'widget'
+        return role
+
+    def platform_is_watch(self):
+        sdk = self.settings.get('SDKROOT')
+        if isinstance(sdk, str) and sdk not in ('', 'auto'):
+            return Path(sdk).name.lower().startswith('watch')
+        platforms = self.settings.get('SUPPORTED_PLATFORMS', '')
+        platforms = set(platforms.split() if isinstance(platforms, str) else platforms)
+        return bool(platforms) and platforms <= WATCH_PLATFORMS
+
+    def containers(self, key=ICLOUD_CONTAINERS):
+        values = (self.entitlements or {}).get(key, [])
+        return {expand(v, self.settings) for v in values}
+
+    def services(self):
+        return set((self.entitlements or {}).get(ICLOUD_SERVICES, []))
+
+
+def collect_target_configs(root='.', resolver=None):
+    """Return a TargetConfig for every (target, configuration) in the project."""
+    resolver = resolver or BuildSettingsResolver(root)
+    table = resolver.table()
+
+    # Only the target objects are needed for product types; settings come memoized
+    product_types = {}
+    with ProjectIndex(resolver.project_path) as project:
+        for target_id in project.root.get('targets', []):
+            target = project.get(target_id)
+            if target is not None:
+                product_types[target.get('name', target_id)] = target.get('productType')
+
+    result = []
+    for name, configs in table.items():
+        for config_name, resolved in configs.items():
+            settings = dict(resolved)
+            bundle_id = settings.get('PRODUCT_BUNDLE_IDENTIFIER')
+            if bundle_id:
+                settings['CFBundleIdentifier'] = bundle_id
+            result.append(TargetConfig(name, product_types.get(name), config_name, settings))
+    return result
+
+
+def load_files(configs, cache):
+    """Attach parsed plists to each TargetConfig; returns read errors."""
+    errors = []
+    for config in configs:
+        for path_attr, value_attr in (('entitlements_path', 'entitlements'),
+                                      ('info_path', 'info')):
+            path = getattr(config, path_attr)
+            if not path:
+                continue
+            value, error = cache.load(expand(path, config.settings))
+            setattr(config, value_attr, value)
+            if error and error not in errors:
+                errors.append(error)
+    return errors
+
+
+# Rules: each takes the list of TargetConfigs and yields (name, passed, message)
+
+def rule_app_has_cloudkit(configs):
+    apps = [c for c in configs if c.role == 'app']
+    if not apps:
+        yield "App target present", False, "No application target found"
+        return
+    for config in apps:
+        missing = []
+        if not config.entitlements_path:
+            missing.append("CODE_SIGN_ENTITLEMENTS")
+        elif config.entitlements is not None:
+            if not config.containers():
+                missing.append(ICLOUD_CONTAINERS)
+            if 'CloudKit' not in config.services():
+                missing.append("CloudKit service")
+        yield (f"{config.label} has CloudKit entitlements", not missing,
+               f"Missing: {', '.join(missing)}" if missing else config.entitlements_path)
+
+
+def rule_ubiquity_subset(configs):
+    for config in configs:
+        if config.entitlements is None or UBIQUITY_CONTAINERS not in config.entitlements:
+            continue
+        extra = config.containers(UBIQUITY_CONTAINERS) - config.containers()
+        yield (f"{config.label} ubiquity containers declared as iCloud containers",
+               not extra, f"Not in {ICLOUD_CONTAINERS}: {', '.join(sorted(extra))}" if extra else "")
+
+
+def rule_configurations_agree(configs):
+    by_target = {}
+    for config in configs:
+        if config.entitlements is not None:
+            by_target.setdefault(config.target, []).append(config)
+    for target, group in by_target.items():
+        first = group[0]
+        differing = [c.configuration for c in group[1:]
+                     if c.containers() != first.containers() or c.services() != first.services()]
+        yield (f"{target} iCloud entitlements identical across configurations", not differing,
+               f"{', '.join(differing)} differ from {first.configuration}" if differing else "")
+
+
+def _apps(configs):
+    """configuration -> app TargetConfigs, in target order."""
+    apps = {}
+    for config in configs:
+        if config.role == 'app':
+            apps.setdefault(config.configuration, []).append(config)
+    return apps
+
+
+def _host_app(config, apps):
+    """The app a watch app or extension ships in, or None if it is unclear.
+
+    Embedded bundle IDs extend the host's, so the app whose bundle ID
+    prefixes config's wins; a lone app is the host otherwise.
+    """
+    candidates = apps.get(config.configuration, [])
+    bundle_id = config.bundle_id or ''
+    for app in candidates:
+        if app.bundle_id and bundle_id.startswith(app.bundle_id + '.'):
+            return app
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def rule_targets_share_containers(configs):
+    apps = _apps(configs)
+    for config in configs:
+        if config.role not in ('watch', 'widget') or config.entitlements is None:
+            continue
+        if not config.containers() and not config.services():
+            continue
+        app = _host_app(config, apps)
+        if app is None or app.entitlements is None:
+            yield f"{config.label} matches app iCloud setup", False, "No app entitlements to compare with"
+            continue
+        problems = []
+        extra = config.containers() - app.containers()
+        if extra:
+            problems.append(f"containers not used by the app: {', '.join(sorted(extra))}")
+        if config.services() != app.services():
+            problems.append(f"services {sorted(config.services())} vs app {sorted(app.services())}")
+        yield f"{config.label} matches app iCloud setup", not problems, "; ".join(problems)
+
+
+def rule_watch_companion(configs):
+    apps = _apps(configs)
+    for config in configs:
+        if config.role != 'watch' or not config.info:
+            continue
+        companion = config.info.get('WKCompanionAppBundleIdentifier')
+        if companion is None:
+            continue
+        companion = expand(companion, config.settings)
+        app_ids = [app.bundle_id for app in apps.get(config.configuration, [])]
+        yield (f"{config.label} companion bundle ID", companion in app_ids,
+               f"{companion} (apps are {', '.join(map(str, app_ids)) or 'missing'})")
+
+
+RULES = (
+    rule_app_has_cloudkit,
+    rule_ubiquity_subset,
+    rule_configurations_agree,
+    rule_targets_share_containers,
+    rule_watch_companion,
+)
+
+
+def check_project(root):
+    """Run every rule; returns (results, read errors, PlistCache)."""
+    configs = collect_target_configs(root)
+    cache = PlistCache(root)
+    errors = load_files(configs, cache)
+    results = [result for rule in RULES for result in rule(configs)]
+    return results, errors, cache
+
+
+def main(argv=None):
+    args = parse_args(make_parser("Cross-check entitlements and Info.plist files across targets"), argv)
+
+    print_header("Entitlements Consistency")
+    try:
+        results, errors, cache = check_project(args.root)
+    except (OSError, pbxproj.PBXParseError) as e:
+        print_result("Load project", False, str(e))
+        return 1
+
+    all_passed = not errors
+    for error in errors:
+        print_result("Load plist", False, error)
+    for name, passed, message in results:
+        print_result(name, passed, message)
+        all_passed = all_passed and passed
+
+    color = GREEN if all_passed else RED
+    print(f"\n{color}{len(results)} checks, {cache.reads} file reads{RESET}")
+    return 0 if all_passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Index of an .appiconset built from its Contents.json.
+
+Contents.json is parsed once into IconSlot entries. Each slot's expected
+pixel size is its point size times its scale, and each slot is joined to
+the IHDR header of its file, read once per distinct filename. Every check
+is then a pass over that index, for any icon set (iPhone, iPad, watch, mac
+or single-size).
+
+Required slots come from REQUIREMENTS, a table keyed by requirements
+version and then by idiom:
+- 'xcode13' is the per-size layout Xcode 13 and earlier generate
+- 'single-size' is the universal 1024pt icon Xcode 14 introduced
+The version is detected from the manifest unless given explicitly. The
+idioms to check come from the device family of the targets using the set
+(device_idioms), or else from every idiom Contents.json lists.
+
+Dark and tinted appearance variants (iOS 18) are kept on each slot; the
+no-alpha and no-grayscale rules only apply to the default appearance.
+"""
+
+import json
+from pathlib import Path
+
+# version -> idiom -> required (size, scale) slots
+REQUIREMENTS = {
+    'xcode13': {
+        'iphone': {
+            ('20x20', '2x'), ('20x20', '3x'), ('29x29', '2x'), ('29x29', '3x'),
+            ('40x40', '2x'), ('40x40', '3x'), ('60x60', '2x'), ('60x60', '3x'),
+        },
+        'ipad': {
+            ('20x20', '1x'), ('20x20', '2x'), ('29x29', '1x'), ('29x29', '2x'),
+            ('40x40', '1x'), ('40x40', '2x'), ('76x76', '1x'), ('76x76', '2x'),
+            ('83.5x83.5', '2x'),
+        },
+        'ios-marketing': {('1024x1024', '1x')},
+        'watch': {
+            ('24x24', '2x'), ('27.5x27.5', '2x'), ('29x29', '2x'), ('29x29', '3x'),
+            ('33x33', '2x'), ('40x40', '2x'), ('44x44', '2x'), ('46x46', '2x'),
+            ('50x50', '2x'), ('51x51', '2x'), ('86x86', '2x'), ('98x98', '2x'),
+            ('108x108', '2x'), ('117x117', '2x'),
+        },
+        'watch-marketing': {('1024x1024', '1x')},
+        'mac': {
+            ('16x16', '1x'), ('16x16', '2x'), ('32x32', '1x'), ('32x32', '2x'),
+            ('128x128', '1x'), ('128x128', '2x'), ('256x256', '1x'), ('256x256', '2x'),
+            ('512x512', '1x'), ('512x512', '2x'),
+        },
+    },
+    'single-size': {
+        'universal': {('1024x1024', None)},
+        'mac': {
+            ('16x16', '1x'), ('16x16', '2x'), ('32x32', '1x'), ('32x32', '2x'),
+            ('128x128', '1x'), ('128x128', '2x'), ('256x256', '1x'), ('256x256', '2x'),
+            ('512x512', '1x'), ('512x512', '2x'),
+        },
+    },
+}
+
+# Idioms whose presence makes another idiom required as well
+COMPANION_IDIOMS = {
+    'iphone': 'ios-marketing',
+    'ipad': 'ios-marketing',
+    'watch': 'watch-marketing',
+}
+
+# Idioms whose 1024px icon is the one App Store Connect shows
+MARKETING_IDIOMS = ('ios-marketing', 'watch-marketing', 'universal', 'mac')
+
+# TARGETED_DEVICE_FAMILY value -> idiom
+DEVICE_FAMILIES = {'1': 'iphone', '2': 'ipad', '4': 'watch', '6': 'mac'}
+
+# SDKROOT prefix -> idiom, for platforms without a device family
+SDK_IDIOMS = {'watch': 'watch', 'macosx': 'mac'}
+
+# Idioms the single universal icon of the single-size layout stands in for
+UNIVERSAL_IDIOMS = {'iphone', 'ipad', 'watch'}
+
+
+def device_idioms(settings):
+    """Idioms a target's resolved build settings ask icons for."""
+    idioms = set()
+    family = settings.get('TARGETED_DEVICE_FAMILY', '')
+    for value in (family.split(',') if isinstance(family, str) else family):
+        if value.strip() in DEVICE_FAMILIES:
+            idioms.add(DEVICE_FAMILIES[value.strip()])
+    sdk = settings.get('SDKROOT')
+    if isinstance(sdk, str):
+        name = Path(sdk).name.lower()
+        idioms.update(idiom for prefix, idiom in SDK_IDIOMS.items() if name.startswith(prefix))
+    return idioms
+
+
+def _slot_order(slot):
+    size, scale = slot
+    return float(size.split('x')[0]), scale or ''
+
+
+class IconSlot:
+    """One Contents.json image entry joined to its file's header."""
+
+    __slots__ = ('idiom', 'size', 'scale', 'filename', 'role', 'subtype', 'platform',
+                 'appearances', 'info')
+
+    def __init__(self, entry):
+        self.idiom = entry.get('idiom')
+        self.size = entry.get('size')
+        self.scale = entry.get('scale')
+        self.filename = entry.get('filename')
+        self.role = entry.get('role')
+        self.subtype = entry.get('subtype')
+        self.platform = entry.get('platform')
+        self.appearances = entry.get('appearances', [])
+        self.info = None
+
+    @property
+    def luminosity(self):
+        """'dark' or 'tinted' for an appearance variant, None for the default icon."""
+        for appearance in self.appearances:
+            if isinstance(appearance, dict) and appearance.get('appearance') == 'luminosity':
+                return appearance.get('value')
+        return None
+
+    @property
+    def label(self):
+        parts = [self.platform or self.idiom, self.size]
+        if self.scale:
+            parts.append(f"@{self.scale}")
+        if self.role:
+            parts.append(f"({self.role}{' ' + self.subtype if self.subtype else ''})")
+        if self.luminosity:
+            parts.append(f"[{self.luminosity}]")
+        return " ".join(p for p in parts if p)
+
+    def expected_pixels(self):
+        """(width, height) in pixels from size x scale, or None if malformed."""
+        try:
+            width, height = (float(v) for v in self.size.split('x'))
+            scale = float(self.scale.rstrip('x')) if self.scale else 1.0
+        except (AttributeError, ValueError):
+            return None
+        return round(width * scale), round(height * scale)
+
+
+class IconManifest:
+    """Parsed Contents.json of one .appiconset, joined to PNG headers."""
+
+    def __init__(self, icon_set, contents):
+        from png_integrity import read_png_info
+
+        self.path = Path(icon_set)
+        self.info = contents['info']
+        self.slots = [IconSlot(entry) for entry in contents['images']]
+
+        # One header read per distinct file, shared by every slot using it
+        self.headers = {}
+        for slot in self.slots:
+            if slot.filename and slot.filename not in self.headers:
+                file_path = self.path / slot.filename
+                self.headers[slot.filename] = read_png_info(file_path) if file_path.is_file() else None
+            slot.info = self.headers.get(slot.filename)
+
+    @classmethod
+    def load(cls, icon_set):
+        """Read <icon_set>/Contents.json; raises ValueError if it is malformed."""
+        contents_path = Path(icon_set) / 'Contents.json'
+        with open(contents_path, 'r') as f:
+            contents = json.load(f)
+        for key in ('images', 'info'):
+            if key not in contents:
+                raise ValueError(f"Missing '{key}' key")
+        return cls(icon_set, contents)
+
+    @property
+    def version(self):
+        """Requirements version the manifest was laid out for."""
+        if any(slot.idiom == 'universal' and slot.platform for slot in self.slots):
+            return 'single-size'
+        return 'xcode13'
+
+    def required_idioms(self, targeted=None, version=None):
+        """Idioms the icon set has to cover.
+
+        targeted are the idioms of the targets using the set (see
+        device_idioms); without them every idiom Contents.json lists counts,
+        whether or not its slots have files. An idiom with any file is always
+        required, so a half-filled idiom is reported either way.
+        """
+        idioms = {slot.idiom for slot in self.slots if slot.filename}
+        idioms.update(targeted or (slot.idiom for slot in self.slots if slot.idiom))
+        if (version or self.version) == 'single-size':
+            # One universal icon serves every device and the App Store
+            return {'universal' if i in UNIVERSAL_IDIOMS else i for i in idioms}
+        idioms.update(COMPANION_IDIOMS[i] for i in list(idioms) if i in COMPANION_IDIOMS)
+        return idioms
+
+    def required_slots(self, idioms=None, version=None):
+        """(idiom, size, scale) slots the requirements table demands."""
+        table = REQUIREMENTS[version or self.version]
+        return [(idiom, size, scale)
+                for idiom in sorted(idioms or self.required_idioms(version=version))
+                for size, scale in sorted(table.get(idiom, ()), key=_slot_order)]
+
+    def missing_slots(self, idioms=None, version=None):
+        """Required slots that have no file assigned."""
+        filled = {(slot.idiom, slot.size, slot.scale) for slot in self.slots if slot.filename}
+        return [key for key in self.required_slots(idioms, version) if key not in filled]
+
+    def files(self):
+        """Distinct filenames referenced by the manifest, in manifest order."""
+        return list(self.headers)
+
+    def slots_for(self, filename):
+        return [slot for slot in self.slots if slot.filename == filename]
+
+    def extra_files(self):
+        """Files in the icon set that Contents.json does not reference."""
+        referenced = set(self.headers) | {'Contents.json'}
+        return sorted(p.name for p in self.path.iterdir() if p.is_file() and p.name not in referenced)
+
+    def marketing_slot(self):
+        """The 1024x1024 slot the App Store uses, or None."""
+        for slot in self.slots:
+            if (slot.idiom in MARKETING_IDIOMS and slot.filename and not slot.luminosity
+                    and slot.expected_pixels() == (1024, 1024)):
+                return slot
+        return None
+
+    def check_file(self, filename):
+        """Join one file to its slots; returns a list of issues."""
+        info = self.headers.get(filename)
+        if not (self.path / filename).is_file():
+            return ["File not found"]
+        if info is None:
+            return ["Not a PNG file"]
+
+        issues = []
+        expected = {slot.expected_pixels() for slot in self.slots_for(filename)}
+        if None in expected:
+            issues.append("Malformed size or scale in Contents.json")
+            expected.discard(None)
+        if len(expected) > 1:
+            sizes = ", ".join(f"{w}x{h}" for w, h in sorted(expected))
+            issues.append(f"Used for slots of different sizes: {sizes}")
+        elif expected and (info.width, info.height) not in expected:
+            (width, height), = expected
+            issues.append(f"Wrong size: {info.width}x{info.height} (expected {width}x{height})")
+        # Dark variants may be transparent and tinted ones are grayscale by
+        # design, so both rules only apply to the default appearance
+        plain = [s for s in self.slots_for(filename) if s.luminosity not in ('dark', 'tinted')]
+        # macOS icons may be shaped; every other platform rejects alpha
+        if info.has_alpha and any(s.idiom != 'mac' for s in plain):
+            issues.append("Has transparency/alpha channel (not allowed)")
+        if info.color_type in (0, 4) and plain:
+            issues.append("Grayscale image (should be RGB)")
+        return issues
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the MCVenture project tools.
+
+    mcv configure     Add the entitlements file to the Xcode project
+    mcv capability    Add the iCloud/CloudKit capability to the target
+    mcv check         Run the CloudKit configuration test suite
+    mcv icons         Validate app icons for App Store compliance
+    mcv build         Build every destination concurrently
+    mcv png           Verify the structure of every PNG in the asset catalogs
+    mcv entitlements  Cross-check entitlements and Info.plist files across targets
+    mcv settings      Show effective build settings per target and configuration
+    mcv assets        Find duplicate and unreferenced images across asset catalogs
+    mcv reconcile     Reconcile project.pbxproj against the files on disk
+
+Subcommands are registered by module name and only imported when invoked,
+so 'mcv --help' and the cheap checks called from git hooks start quickly.
+Every subcommand accepts '--root' (or $MCV_PROJECT_ROOT) to point at the
+project directory.
+
+Install with: ln -s "$PWD/mcv.py" /usr/local/bin/mcv
+"""
+
+import os
+import sys
+
+# name -> (module, summary); modules must expose main(argv) -> exit code
+COMMANDS = {
+    'configure': ('configure_cloudkit', "Add the entitlements file to the Xcode project"),
+    'capability': ('setup_cloudkit_capability', "Add the iCloud/CloudKit capability"),
+    'check': ('test_cloudkit_config', "Run the CloudKit configuration test suite"),
+    'icons': ('validate_app_icons', "Validate app icons for App Store compliance"),
+    'build': ('build_matrix', "Build every destination concurrently"),
+    'png': ('png_integrity', "Verify the structure of every PNG in the asset catalogs"),
+    'entitlements': ('entitlements_check', "Cross-check entitlements and Info.plist files across targets"),
+    'settings': ('build_settings', "Show effective build settings per target and configuration"),
+    'assets': ('asset_duplicates', "Find duplicate and unreferenced images across asset catalogs"),
+    'reconcile': ('project_reconcile', "Reconcile project.pbxproj against the files on disk"),
+}
+
+
+def print_usage(stream=sys.stdout):
+    print("usage: mcv <command> [options]\n", file=stream)
+    print("commands:", file=stream)
+    width = max(len(name) for name in COMMANDS)
+    for name, (_, summary) in COMMANDS.items():
+        print(f"  {name:<{width}}  {summary}", file=stream)
+    print("\nRun 'mcv <command> --help' for command options.", file=stream)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print_usage()
+        return 0
+
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"mcv: unknown command '{name}'\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        return 2
+
+    # The tools live next to this file, which may be reached via a symlink
+    tools_dir = os.path.dirname(os.path.realpath(__file__))
+    if tools_dir not in sys.path:
+        sys.path.insert(0, tools_dir)
+
+    from importlib import import_module
+
+    module = import_module(COMMANDS[name][0])
+    # argparse derives 'prog' from argv[0]
+    sys.argv[0] = f"mcv {name}"
+    return module.main(rest)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
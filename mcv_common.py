@@ -0,0 +1,91 @@
+"""
+Shared terminal output and project-root handling for the MCVenture tools.
+
+Every tool prints the same banner/PASS/FAIL layout and needs to know where
+the Xcode project lives. Keep this module import-light: every subcommand
+mcv.py dispatches to imports it, including the cheap ones called from git
+hooks.
+"""
+
+import os
+from pathlib import Path
+
+# ANSI color codes
+GREEN = '\033[92m'
+RED = '\033[91m'
+YELLOW = '\033[93m'
+BLUE = '\033[94m'
+RESET = '\033[0m'
+
+PROJECT_NAME = 'MCVenture'
+ROOT_ENV_VAR = 'MCV_PROJECT_ROOT'
+
+
+def print_header(text, width=60, center=False):
+    text = f"{text:^{width}}" if center else text
+    print(f"\n{BLUE}{'=' * width}{RESET}")
+    print(f"{BLUE}{text}{RESET}")
+    print(f"{BLUE}{'=' * width}{RESET}\n")
+
+
+def print_result(name, passed, message=""):
+    status = f"{GREEN}✅ PASS{RESET}" if passed else f"{RED}❌ FAIL{RESET}"
+    print(f"{status} - {name}")
+    if message:
+        print(f"        {message}")
+
+
+def print_checks(checks):
+    """Print (name, condition) pairs; returns True when all passed."""
+    all_passed = True
+    for name, condition in checks:
+        print_result(name, condition)
+        all_passed = all_passed and condition
+    return all_passed
+
+
+def print_banner(text, color, width=60):
+    print(f"{color}{'=' * width}{RESET}")
+    print(f"{color}{text}{RESET}")
+    print(f"{color}{'=' * width}{RESET}")
+
+
+def find_project_root(explicit=None):
+    """Locate the directory containing MCVenture.xcodeproj.
+
+    Resolution order: explicit path, $MCV_PROJECT_ROOT, the current
+    directory or any parent holding the project, then this file's directory.
+    """
+    if explicit:
+        return Path(explicit).expanduser().resolve()
+
+    env_root = os.environ.get(ROOT_ENV_VAR)
+    if env_root:
+        return Path(env_root).expanduser().resolve()
+
+    cwd = Path.cwd()
+    for candidate in (cwd, *cwd.parents):
+        if (candidate / f'{PROJECT_NAME}.xcodeproj').is_dir():
+            return candidate
+
+    return Path(__file__).resolve().parent
+
+
+def make_parser(description):
+    """Return an argument parser with the standard '--root' option."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--root',
+        help=f"project directory (default: ${ROOT_ENV_VAR}, then the nearest "
+             f"directory containing {PROJECT_NAME}.xcodeproj)",
+    )
+    return parser
+
+
+def parse_args(parser, argv=None):
+    """Parse argv and resolve args.root to the project directory."""
+    args = parser.parse_args(argv)
+    args.root = find_project_root(args.root)
+    return args
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Reader and writer for Xcode project.pbxproj files.
+
+project.pbxproj is an old-style (OpenStep) ASCII property list. This module
+parses it into plain Python dicts, lists and strings, and writes it back in
+the canonical layout Xcode itself produces:
+- objects grouped into "/* Begin <isa> section */" blocks, sorted by isa
+- objects sorted by ID within a section
+- 'isa' first, then the remaining keys in sorted order
+- PBXBuildFile and PBXFileReference objects written on a single line
+
+Annotation comments such as "6E7A... /* MCVenture */" are kept on the value
+they follow (see Ref), so a parse/dump round trip reproduces Xcode's output.
+Both directions run in a single linear pass over the input.
+
+reference_paths() resolves file references and groups to paths relative to
+the project directory, following each group's sourceTree.
+"""
+
+import re
+
+HEADER = '// !$*UTF8*$!'
+
+# Object types Xcode writes on a single line
+INLINE_ISAS = frozenset({'PBXBuildFile', 'PBXFileReference'})
+
+# Whitespace and line comments are skipped; every other token is one group
+_TOKEN = re.compile(r'''
+    \s*(?://[^\n]*\s*)*
+    (?:
+        (?P<comment>/\*.*?\*/)
+      | (?P<quoted>"[^"\\]*(?:\\.[^"\\]*)*")
+      | (?P<bare>(?:[^\s{}()=;,"/]|/(?![*/]))[^\s{}()=;,"/]*(?:/(?![*/])[^\s{}()=;,"/]*)*)
+      | (?P<punct>[{}()=;,])
+      | (?P<bad>.)
+    )
+''', re.VERBOSE | re.DOTALL)
+
+_BARE_SAFE = re.compile(r'[A-Za-z0-9_$./]+\Z')
+
+_UNESCAPE = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+_ESCAPE = {'\n': '\\n', '\t': '\\t', '\r': '\\r', '"': '\\"', '\\': '\\\\'}
+
+
+class PBXParseError(ValueError):
+    """Raised when a project file is not a valid ASCII property list."""
+
+
+class Ref(str):
+    """A string that carries the annotation comment written after it."""
+
+    __slots__ = ('comment',)
+
+    def __new__(cls, value, comment=None):
+        self = super().__new__(cls, value)
+        self.comment = comment
+        return self
+
+
+def _unquote(text):
+    if '\\' not in text:
+        return text
+    return re.sub(r'\\(.)', lambda m: _UNESCAPE.get(m.group(1), m.group(1)), text)
+
+
+class _Punct(str):
+    """Punctuation token, kept distinct from string values like ","."""
+
+    __slots__ = ()
+
+
+_PUNCT = {c: _Punct(c) for c in '{}()=;,'}
+
+
+def _tokenize(text):
+    """Return a flat token list, attaching comments to preceding strings."""
+    tokens = []
+    append = tokens.append
+    for comment, quoted, bare, punct, bad in _TOKEN.findall(text.rstrip()):
+        if punct:
+            append(_PUNCT[punct])
+        elif bare:
+            append(bare)
+        elif quoted:
+            append(_unquote(quoted[1:-1]))
+        elif bad:
+            raise PBXParseError(f"Unexpected character {bad!r}")
+        elif comment and tokens and type(tokens[-1]) is str:
+            tokens[-1] = Ref(tokens[-1], comment[2:-2].strip())
+    return tokens
+
+
+def loads(text):
+    """Parse the contents of a project.pbxproj file into a dict."""
+    tokens = _tokenize(text)
+    tokens.append(None)
+
+    def expect(i, wanted):
+        if tokens[i] != wanted or type(tokens[i]) is not _Punct:
+            raise PBXParseError(f"Expected {wanted!r} at token {i}, found {tokens[i]!r}")
+        return i + 1
+
+    def value(i):
+        token = tokens[i]
+        if type(token) is not _Punct:
+            if token is None:
+                raise PBXParseError("Unexpected end of file")
+            return token, i + 1
+        i += 1
+        if token == '{':
+            result = {}
+            while not (tokens[i] == '}' and type(tokens[i]) is _Punct):
+                key = tokens[i]
+                if key is None or type(key) is _Punct:
+                    raise PBXParseError(f"Expected dictionary key at token {i}, found {key!r}")
+                result[key], i = value(expect(i + 1, '='))
+                i = expect(i, ';')
+            return result, i + 1
+        if token == '(':
+            result = []
+            while not (tokens[i] == ')' and type(tokens[i]) is _Punct):
+                item, i = value(i)
+                result.append(item)
+                if tokens[i] == ')' and type(tokens[i]) is _Punct:
+                    break
+                i = expect(i, ',')
+            return result, i + 1
+        raise PBXParseError(f"Unexpected {token!r} at token {i - 1}")
+
+    root, i = value(0)
+    if not isinstance(root, dict):
+        raise PBXParseError("Project root is not a dictionary")
+    if tokens[i] is not None:
+        raise PBXParseError(f"Trailing data at token {i}")
+    return root
+
+
+def load(path):
+    """Parse the project.pbxproj file at path."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return loads(f.read())
+
+
+def _quote(text):
+    if _BARE_SAFE.match(text) and '//' not in text:
+        return text
+    return '"' + ''.join(_ESCAPE.get(c, c) for c in text) + '"'
+
+
+def _scalar(text):
+    comment = getattr(text, 'comment', None)
+    if comment:
+        return f"{_quote(text)} /* {comment} */"
+    return _quote(text)
+
+
+def _sort_keys(obj):
+    keys = sorted(obj)
+    if 'isa' in obj:
+        keys.remove('isa')
+        keys.insert(0, 'isa')
+    return keys
+
+
+def _write_inline(out, val):
+    if isinstance(val, dict):
+        out.append('{')
+        for key in _sort_keys(val):
+            out.append(f"{_scalar(key)} = ")
+            _write_inline(out, val[key])
+            out.append('; ')
+        out.append('}')
+    elif isinstance(val, list):
+        out.append('(')
+        for item in val:
+            _write_inline(out, item)
+            out.append(', ')
+        out.append(')')
+    else:
+        out.append(_scalar(val))
+
+
+def _write(out, val, depth):
+    if isinstance(val, dict):
+        if val.get('isa') in INLINE_ISAS:
+            _write_inline(out, val)
+            return
+        out.append('{\n')
+        for key in _sort_keys(val):
+            out.append('\t' * (depth + 1) + f"{_scalar(key)} = ")
+            _write(out, val[key], depth + 1)
+            out.append(';\n')
+        out.append('\t' * depth + '}')
+    elif isinstance(val, list):
+        out.append('(\n')
+        for item in val:
+            out.append('\t' * (depth + 1))
+            _write(out, item, depth + 1)
+            out.append(',\n')
+        out.append('\t' * depth + ')')
+    else:
+        out.append(_scalar(val))
+
+
+def _write_objects(out, objects):
+    sections = {}
+    for object_id, obj in objects.items():
+        isa = obj.get('isa', '') if isinstance(obj, dict) else ''
+        sections.setdefault(isa, []).append(object_id)
+
+    out.append('{\n')
+    for isa in sorted(sections):
+        out.append(f"\n/* Begin {isa} section */\n")
+        for object_id in sorted(sections[isa]):
+            out.append(f"\t\t{_scalar(object_id)} = ")
+            _write(out, objects[object_id], 2)
+            out.append(';\n')
+        out.append(f"/* End {isa} section */\n")
+    out.append('\t}')
+
+
+def dumps(project):
+    """Serialize a parsed project back to canonical project.pbxproj text."""
+    out = [HEADER, '\n{\n']
+    for key in _sort_keys(project):
+        out.append(f"\t{_scalar(key)} = ")
+        if key == 'objects' and isinstance(project[key], dict):
+            _write_objects(out, project[key])
+        else:
+            _write(out, project[key], 1)
+        out.append(';\n')
+    out.append('}\n')
+    return ''.join(out)
+
+
+def dump(project, path):
+    """Write a parsed project to path in canonical form."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(dumps(project))
+
+
+# isa types whose 'children' form the group tree
+GROUP_ISAS = frozenset({'PBXGroup', 'PBXVariantGroup', 'XCVersionGroup'})
+
+
+def reference_paths(project):
+    """Map file reference and group IDs to paths relative to the project dir.
+
+    Objects whose sourceTree is outside the source tree (BUILT_PRODUCTS_DIR,
+    SDKROOT, ...) are omitted. Synchronized folders are included by path.
+    """
+    objects = project['objects']
+    root = objects[project['rootObject']]
+    paths = {}
+
+    def resolve(object_id, parent_path):
+        obj = objects.get(object_id)
+        if not isinstance(obj, dict):
+            return
+        tree = obj.get('sourceTree', '<group>')
+        path = obj.get('path', '')
+        if tree == '<group>':
+            resolved = f"{parent_path}/{path}" if parent_path and path else (path or parent_path)
+        elif tree in ('SOURCE_ROOT', '<absolute>'):
+            resolved = path
+        else:
+            return
+        paths[object_id] = resolved
+        if obj.get('isa') in GROUP_ISAS:
+            for child in obj.get('children', []):
+                resolve(child, resolved)
+
+    main_group = root.get('mainGroup')
+    if main_group:
+        resolve(main_group, '')
+    return paths
@@ -0,0 +1,270 @@
+"""
+Lazy, read-only access to project.pbxproj for checks that touch few objects.
+
+Parsing a whole project builds a dict per object, which for very large
+projects costs hundreds of MB. ProjectIndex instead memory-maps the file and
+records only where each object lives:
+- object IDs packed into one sorted bytes blob (24 bytes per object)
+- byte spans and isa codes in array.array storage
+Objects are parsed on first access into ObjectRecord instances (__slots__)
+and kept for reuse, so memory grows with what a check touches, not with
+the size of the project.
+
+The index relies on the layout Xcode writes (one object per entry at two
+tabs of indentation, 'isa' first); pbxproj.dumps produces the same layout.
+"""
+
+import heapq
+import mmap
+import re
+from array import array
+
+import pbxproj
+
+ID_WIDTH = 24
+
+_OBJECTS_START = re.compile(rb'^\tobjects = \{\n', re.MULTILINE)
+_OBJECT = re.compile(
+    rb'^\t\t(?P<id>[0-9A-Za-z_.]+|"[^"\n]*")(?: /\*[^\n]*?\*/)? = '
+    rb'\{\n?\t*isa = (?P<isa>[A-Za-z0-9_]+);',
+    re.MULTILINE,
+)
+_ROOT_OBJECT = re.compile(rb'^\trootObject = (?P<id>[0-9A-Za-z_.]+)', re.MULTILINE)
+
+
+class ObjectRecord:
+    """A single materialized project object."""
+
+    __slots__ = ('id', 'isa', 'fields')
+
+    def __init__(self, object_id, fields):
+        self.id = object_id
+        self.isa = fields.get('isa')
+        self.fields = fields
+
+    def __getitem__(self, key):
+        return self.fields[key]
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def get(self, key, default=None):
+        return self.fields.get(key, default)
+
+    def __repr__(self):
+        return f"<{self.isa} {self.id}>"
+
+
+class _IdTable:
+    """Sorted fixed-width ID blob with parallel array-backed columns."""
+
+    __slots__ = ('blob', 'starts', 'ends', 'isas')
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self.isas = array('H')
+
+    def append(self, object_id, start, end, code):
+        self.blob += object_id
+        self.starts.append(start)
+        self.ends.append(end)
+        self.isas.append(code)
+
+    def finish(self):
+        """Sort rows by ID.
+
+        Xcode writes each isa section sorted, so the rows form a few sorted
+        runs; merging them streams instead of building a permutation list.
+        """
+        blob = self.blob
+        count = len(self.starts)
+
+        def key(row):
+            return blob[row * ID_WIDTH:(row + 1) * ID_WIDTH]
+
+        runs = []
+        run_start = 0
+        for row in range(1, count):
+            if key(row) < key(row - 1):
+                runs.append(range(run_start, row))
+                run_start = row
+        if run_start or runs:
+            runs.append(range(run_start, count))
+            merged = _IdTable()
+            for row in heapq.merge(*runs, key=key):
+                merged.append(key(row), self.starts[row], self.ends[row], self.isas[row])
+            blob = merged.blob
+            self.starts, self.ends, self.isas = merged.starts, merged.ends, merged.isas
+        self.blob = bytes(blob)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find(self, key):
+        """Return the row of a 24-byte ID, or -1."""
+        blob = self.blob
+        lo, hi = 0, len(self.starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = blob[mid * ID_WIDTH:(mid + 1) * ID_WIDTH]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def id_at(self, row):
+        return self.blob[row * ID_WIDTH:(row + 1) * ID_WIDTH].decode('ascii')
+
+
+class ProjectIndex:
+    """Offset index over a memory-mapped project.pbxproj."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise pbxproj.PBXParseError(f"{self.path} is empty") from None
+        self._records = {}
+        self.isa_names = []
+        self.root_object_id = None
+        self._build()
+
+    def _build(self):
+        mm = self._map
+        match = _OBJECTS_START.search(mm)
+        if match is None:
+            raise pbxproj.PBXParseError("No 'objects' dictionary found")
+        region_start = match.end()
+        region_end = mm.find(b'\n\t};', region_start)
+        if region_end < 0:
+            raise pbxproj.PBXParseError("Unterminated 'objects' dictionary")
+
+        isa_codes = {}
+        table = _IdTable()
+        odd = {}
+        previous = None
+        for match in _OBJECT.finditer(mm, region_start, region_end):
+            if previous is not None:
+                self._close(previous, match.start(), table, odd)
+            isa = match.group('isa')
+            code = isa_codes.get(isa)
+            if code is None:
+                code = isa_codes[isa] = len(self.isa_names)
+                self.isa_names.append(isa.decode('ascii'))
+            previous = (match, code)
+        if previous is not None:
+            self._close(previous, region_end, table, odd)
+        elif mm.find(b'=', region_start, region_end) >= 0:
+            raise pbxproj.PBXParseError("Objects are not in Xcode's layout; use pbxproj.load")
+
+        table.finish()
+        self._table = table
+        # IDs that are not 24 characters wide are rare; keep them in a dict
+        self._odd = odd
+
+        root = _ROOT_OBJECT.search(mm, region_end)
+        if root is not None:
+            self.root_object_id = root.group('id').decode('ascii')
+
+    def _close(self, previous, limit, table, odd):
+        """Record the span of the previous object, which ends before limit."""
+        match, code = previous
+        object_id = match.group('id').strip(b'"')
+        start = self._map.find(b'{', match.end('id'), limit)
+        end = self._map.rfind(b'}', start, limit) + 1
+        if len(object_id) == ID_WIDTH:
+            table.append(object_id, start, end, code)
+        else:
+            odd[object_id.decode('utf-8')] = (start, end, code)
+
+    def close(self):
+        self._records.clear()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._table) + len(self._odd)
+
+    def _locate(self, object_id):
+        """Return (start, end, isa code) for an ID, or None."""
+        if len(object_id) == ID_WIDTH:
+            try:
+                key = object_id.encode('ascii')
+            except UnicodeEncodeError:
+                return None
+            row = self._table.find(key)
+            if row < 0:
+                return None
+            return self._table.starts[row], self._table.ends[row], self._table.isas[row]
+        return self._odd.get(object_id)
+
+    def __contains__(self, object_id):
+        return self._locate(object_id) is not None
+
+    def isa_of(self, object_id):
+        """Return an object's isa without materializing it."""
+        location = self._locate(object_id)
+        return self.isa_names[location[2]] if location else None
+
+    def get(self, object_id, default=None):
+        """Return the ObjectRecord for an ID, parsing it on first access."""
+        record = self._records.get(object_id)
+        if record is not None:
+            return record
+        location = self._locate(object_id)
+        if location is None:
+            return default
+        start, end, _ = location
+        fields = pbxproj.loads(self._map[start:end].decode('utf-8'))
+        record = self._records[object_id] = ObjectRecord(object_id, fields)
+        return record
+
+    def __getitem__(self, object_id):
+        record = self.get(object_id)
+        if record is None:
+            raise KeyError(object_id)
+        return record
+
+    @property
+    def root(self):
+        if self.root_object_id is None:
+            raise pbxproj.PBXParseError("No rootObject")
+        return self[self.root_object_id]
+
+    def ids(self, isa=None):
+        """Yield object IDs, optionally only those of one isa."""
+        code = self.isa_names.index(isa) if isa in self.isa_names else None
+        if isa is not None and code is None:
+            return
+        table = self._table
+        for row in range(len(table)):
+            if code is None or table.isas[row] == code:
+                yield table.id_at(row)
+        for object_id, (_, _, row_code) in self._odd.items():
+            if code is None or row_code == code:
+                yield object_id
+
+    def objects(self, isa):
+        """Yield ObjectRecords of one isa, materializing only those."""
+        for object_id in self.ids(isa):
+            yield self[object_id]
+
+    def contains_text(self, needle):
+        """Raw substring search over the mapped file."""
+        if isinstance(needle, str):
+            needle = needle.encode('utf-8')
+        return self._map.find(needle) >= 0
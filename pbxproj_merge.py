@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Semantic three-way merge driver for project.pbxproj.
+
+Instead of merging the file line by line, base, ours and theirs are parsed
+into object maps keyed by ID and merged per object and per key:
+- objects added or removed on one side are taken from that side
+- keys changed on only one side are taken from that side
+- nested dictionaries (buildSettings, TargetAttributes) merge per key
+- ID lists (children, files, buildPhases) merge insertions and removals
+  from both sides, keeping each inserted item next to its neighbour
+Only changes that genuinely disagree are reported as conflicts, plus any
+object reference (fileRef, children, buildPhases, target, ...) that resolves
+on its own side but dangles after merging, e.g. theirs adds a build file for
+a file reference ours deleted. The merged project is written back in Xcode's
+canonical layout. Every step is a dict or set lookup, so merging is linear
+in the size of the project.
+
+Setup (once per clone):
+    git config merge.pbxproj.name "Xcode project merge"
+    git config merge.pbxproj.driver "python3 pbxproj_merge.py %O %A %B %P"
+
+.gitattributes routes *.pbxproj through the driver. When the driver is not
+configured git falls back to its normal text merge.
+"""
+
+import subprocess
+import sys
+
+import pbxproj
+
+_MISSING = object()
+
+
+class _Merger:
+    def __init__(self):
+        self.conflicts = []
+        # Top-level keys and ('objects', ID) entries where ours != theirs
+        self.changed = set()
+
+    def conflict(self, path, message):
+        self.conflicts.append(f"{'/'.join(path)}: {message}")
+
+    def value(self, path, base, ours, theirs):
+        """Merge a single value; _MISSING means the key is absent."""
+        if ours == theirs:
+            return ours
+        if len(path) == 1 or (len(path) == 2 and path[0] == 'objects'):
+            self.changed.add(tuple(path))
+        if ours == base:
+            return theirs
+        if theirs == base:
+            return ours
+
+        if isinstance(ours, dict) and isinstance(theirs, dict):
+            return self.dict(path, base if isinstance(base, dict) else {}, ours, theirs)
+        if isinstance(ours, list) and isinstance(theirs, list):
+            merged = self.list(base if isinstance(base, list) else [], ours, theirs)
+            if merged is not None:
+                return merged
+
+        if ours is _MISSING:
+            self.conflict(path, "removed in ours, modified in theirs")
+        elif theirs is _MISSING:
+            self.conflict(path, "modified in ours, removed in theirs")
+        else:
+            self.conflict(path, f"ours={_describe(ours)} theirs={_describe(theirs)}")
+        # Keep our side so the result is still a well-formed project
+        return ours
+
+    def dict(self, path, base, ours, theirs):
+        merged = {}
+        # Iterating the sides' own keys keeps their annotation comments
+        keys = list(ours)
+        keys.extend(key for key in theirs if key not in ours)
+        for key in keys:
+            result = self.value(
+                path + [key],
+                base.get(key, _MISSING),
+                ours.get(key, _MISSING),
+                theirs.get(key, _MISSING),
+            )
+            if result is not _MISSING:
+                merged[key] = result
+        return merged
+
+    def list(self, base, ours, theirs):
+        """Merge insertions and removals of unique string items.
+
+        Returns None when the lists hold nested values or duplicates, in
+        which case the caller reports a conflict.
+        """
+        for items in (base, ours, theirs):
+            if not all(isinstance(item, str) for item in items):
+                return None
+            if len(set(items)) != len(items):
+                return None
+
+        base_set = set(base)
+        ours_set = set(ours)
+        theirs_set = set(theirs)
+
+        # Anchor each item theirs added to the item preceding it
+        inserts = {}
+        previous = None
+        for item in theirs:
+            if item not in base_set and item not in ours_set:
+                inserts.setdefault(previous, []).append(item)
+            else:
+                previous = item
+
+        merged = []
+        merged.extend(inserts.pop(None, []))
+        for item in ours:
+            if item in base_set and item not in theirs_set:
+                # Removed in theirs; still place anything anchored to it
+                merged.extend(inserts.pop(item, []))
+                continue
+            merged.append(item)
+            merged.extend(inserts.pop(item, []))
+        # Anchors removed by ours: append remaining insertions in order
+        for items in inserts.values():
+            merged.extend(items)
+        return merged
+
+
+def _describe(val):
+    if val is _MISSING:
+        return '<removed>'
+    text = repr(val) if not isinstance(val, str) else str(val)
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+def _strings(value, path):
+    """Yield (path, string) for every string and dict key inside value."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield path, key
+            yield from _strings(item, path + [key])
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item, path)
+    elif isinstance(value, str):
+        yield path, value
+
+
+def _mentions(value, ids):
+    """True if any string or dict key inside value is in ids."""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if item in ids:
+                return True
+        elif isinstance(item, dict):
+            if not ids.isdisjoint(item):
+                return True
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
+
+
+def _dangling(base, ours, theirs, merged, changed):
+    """(path, ID) pairs that reference an object deleted on one side.
+
+    Only the changed entries (where ours and theirs differ) are scanned,
+    and paths are built only for entries that mention a deleted ID, so a
+    merge without deletions adds nothing to the per-key merge.
+    """
+    sides = (ours, theirs)
+    objects = [project.get('objects', {}) for project in sides]
+    base_objects = base.get('objects', {})
+    merged_objects = merged.get('objects', {})
+    # An object deleted on one side only is always a changed entry
+    deleted = {key[1] for key in changed
+               if len(key) == 2 and key[1] in base_objects and key[1] not in merged_objects}
+    if not deleted:
+        return set()
+
+    def lookup(project, key):
+        if len(key) == 1:
+            return project.get(key[0], _MISSING)
+        return project.get('objects', {}).get(key[1], _MISSING)
+
+    found = set()
+    for key in changed:
+        if key == ('objects',):
+            continue
+        value = lookup(merged, key)
+        # Entries both sides agree on dangle on their own side already
+        if value is _MISSING or not _mentions(value, deleted):
+            continue
+        versions = [lookup(side, key) for side in sides]
+        hits = {('/'.join(path), ref) for path, ref in _strings(value, list(key)) if ref in deleted}
+        for version, side_objects in zip(versions, objects):
+            if version is not _MISSING:
+                hits -= {('/'.join(path), ref) for path, ref in _strings(version, list(key))
+                         if ref in deleted and ref not in side_objects}
+        found |= hits
+    return found
+
+
+def merge(base, ours, theirs):
+    """Three-way merge parsed projects; returns (merged, conflicts)."""
+    merger = _Merger()
+    merged = merger.dict([], base, ours, theirs)
+
+    # Per-key merging cannot see that one side deleted an object the other
+    # side started using; flag references that only dangle after the merge
+    for path, ref in sorted(_dangling(base, ours, theirs, merged, merger.changed)):
+        merger.conflict([path], f"references {ref}, which the other side removed")
+    return merged, merger.conflicts
+
+
+def merge_files(base_path, ours_path, theirs_path):
+    """Merge three project files; returns (merged text, conflicts)."""
+    base, ours, theirs = (pbxproj.load(p) for p in (base_path, ours_path, theirs_path))
+    merged, conflicts = merge(base, ours, theirs)
+    return pbxproj.dumps(merged), conflicts
+
+
+def main(argv):
+    if len(argv) < 4:
+        print("Usage: pbxproj_merge.py BASE OURS THEIRS [PATH]", file=sys.stderr)
+        return 2
+
+    base_path, ours_path, theirs_path = argv[1:4]
+    display = argv[4] if len(argv) > 4 else ours_path
+
+    try:
+        text, conflicts = merge_files(base_path, ours_path, theirs_path)
+    except (OSError, pbxproj.PBXParseError) as e:
+        print(f"❌ {display}: cannot parse project ({e}); using text merge", file=sys.stderr)
+        return _text_merge(base_path, ours_path, theirs_path)
+
+    if conflicts:
+        print(f"❌ {display}: {len(conflicts)} semantic conflict(s):", file=sys.stderr)
+        for conflict in conflicts:
+            print(f"   {conflict}", file=sys.stderr)
+        # Leave standard conflict markers in place for manual resolution
+        _text_merge(base_path, ours_path, theirs_path)
+        return 1
+
+    with open(ours_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"✅ {display}: merged semantically", file=sys.stderr)
+    return 0
+
+
+def _text_merge(base_path, ours_path, theirs_path):
+    result = subprocess.run(
+        ['git', 'merge-file', '-L', 'ours', '-L', 'base', '-L', 'theirs',
+         ours_path, base_path, theirs_path],
+    )
+    return 1 if result.returncode != 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Structural PNG integrity checks for asset catalogs.
+
+A truncated or corrupted PNG otherwise only shows up when actool fails.
+Each file is memory-mapped and its chunk table walked with memoryview
+slices, so no image data is copied. For every file this verifies:
+- the PNG signature and each chunk's length and CRC32
+- chunk ordering: IHDR first, PLTE before IDAT, IDAT chunks consecutive,
+  IEND last with nothing after it
+- that the IDAT stream inflates to exactly the size IHDR implies
+
+Decompressed output is counted and discarded in bounded pieces, so memory
+use stays flat regardless of image size.
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+from mcv_common import (
+    GREEN, RED, RESET,
+    make_parser, parse_args, print_header, print_result,
+)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# color type -> samples per pixel, allowed bit depths
+COLOR_TYPES = {
+    0: (1, (1, 2, 4, 8, 16)),  # grayscale
+    2: (3, (8, 16)),           # truecolor
+    3: (1, (1, 2, 4, 8)),      # indexed
+    4: (2, (8, 16)),           # grayscale + alpha
+    6: (4, (8, 16)),           # truecolor + alpha
+}
+
+# Adam7 passes: (x start, y start, x step, y step)
+ADAM7 = (
+    (0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4),
+    (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2),
+)
+
+# Upper bound on each piece of inflated output held in memory
+INFLATE_CHUNK = 256 * 1024
+
+_CHUNK_HEADER = struct.Struct('>I4s')
+_IHDR = struct.Struct('>IIBBBBB')
+
+
+class PNGInfo:
+    """Header fields of a PNG file."""
+
+    __slots__ = ('width', 'height', 'bit_depth', 'color_type', 'interlace')
+
+    def __init__(self, width, height, bit_depth, color_type, interlace):
+        self.width = width
+        self.height = height
+        self.bit_depth = bit_depth
+        self.color_type = color_type
+        self.interlace = interlace
+
+    @property
+    def has_alpha(self):
+        return self.color_type in (4, 6)
+
+    def row_bytes(self, width):
+        """Bytes in one filtered scanline of the given width (with filter byte)."""
+        samples = COLOR_TYPES[self.color_type][0]
+        return 1 + (width * samples * self.bit_depth + 7) // 8
+
+    def expected_data_size(self):
+        """Size of the decompressed IDAT stream implied by the header."""
+        if not self.interlace:
+            return self.height * self.row_bytes(self.width)
+        total = 0
+        for x0, y0, dx, dy in ADAM7:
+            pass_width = (self.width - x0 + dx - 1) // dx
+            pass_height = (self.height - y0 + dy - 1) // dy
+            if pass_width and pass_height:
+                total += pass_height * self.row_bytes(pass_width)
+        return total
+
+
+def iter_chunks(data):
+    """Yield (type, body, crc, offset) for each chunk in a PNG buffer.
+
+    data must be a memoryview starting at the signature. Raises ValueError
+    when a chunk runs past the end of the buffer.
+    """
+    offset = len(PNG_SIGNATURE)
+    end = len(data)
+    while offset < end:
+        if end - offset < 12:
+            raise ValueError(f"Truncated chunk header at offset {offset}")
+        length, chunk_type = _CHUNK_HEADER.unpack_from(data, offset)
+        body_start = offset + 8
+        body_end = body_start + length
+        if body_end + 4 > end:
+            raise ValueError(f"Chunk {chunk_type!r} at offset {offset} is truncated")
+        crc = int.from_bytes(data[body_end:body_end + 4], 'big')
+        yield chunk_type, data[body_start:body_end], crc, offset
+        offset = body_end + 4
+
+
+def parse_ihdr(body):
+    """Return PNGInfo for an IHDR chunk body, or raise ValueError."""
+    if len(body) != _IHDR.size:
+        raise ValueError(f"IHDR has length {len(body)} (expected {_IHDR.size})")
+    width, height, depth, color, compression, filter_method, interlace = _IHDR.unpack(body)
+    if not width or not height:
+        raise ValueError(f"Invalid dimensions {width}x{height}")
+    if color not in COLOR_TYPES or depth not in COLOR_TYPES[color][1]:
+        raise ValueError(f"Invalid bit depth {depth} for color type {color}")
+    if compression or filter_method or interlace not in (0, 1):
+        raise ValueError("Unknown compression, filter or interlace method")
+    return PNGInfo(width, height, depth, color, interlace)
+
+
+def read_png_info(path):
+    """Read only the signature and IHDR of a PNG; returns PNGInfo or None."""
+    with open(path, 'rb') as f:
+        head = f.read(len(PNG_SIGNATURE) + 8 + _IHDR.size)
+    if not head.startswith(PNG_SIGNATURE) or head[12:16] != b'IHDR':
+        return None
+    try:
+        return parse_ihdr(head[16:])
+    except ValueError:
+        return None
+
+
+def _inflate(inflater, data):
+    """Feed data to a decompressobj; returns the number of bytes produced."""
+    count = 0
+    while True:
+        piece = inflater.decompress(data, INFLATE_CHUNK)
+        count += len(piece)
+        data = inflater.unconsumed_tail
+        # A short piece means zlib ran out of input rather than output space
+        if inflater.eof or len(piece) < INFLATE_CHUNK:
+            return count
+
+
+def _check_chunks(data):
+    """Walk and verify the chunk table; returns (PNGInfo, issues)."""
+    issues = []
+    info = None
+    inflater = zlib.decompressobj()
+    inflated = 0
+    inflate_error = None
+    seen_idat = False
+    idat_closed = False
+    seen_plte = False
+    seen_iend = False
+
+    for index, (chunk_type, body, crc, offset) in enumerate(iter_chunks(data)):
+        name = chunk_type.decode('latin-1')
+        if seen_iend:
+            issues.append(f"Data after IEND at offset {offset}")
+            break
+        if zlib.crc32(body, zlib.crc32(chunk_type)) != crc:
+            issues.append(f"CRC mismatch in {name} chunk at offset {offset}")
+
+        if index == 0:
+            if chunk_type != b'IHDR':
+                issues.append(f"First chunk is {name}, not IHDR")
+                return None, issues
+            try:
+                info = parse_ihdr(body)
+            except ValueError as e:
+                issues.append(str(e))
+                return None, issues
+            continue
+
+        if chunk_type == b'IHDR':
+            issues.append(f"Duplicate IHDR at offset {offset}")
+        elif chunk_type == b'PLTE':
+            if seen_idat:
+                issues.append("PLTE appears after IDAT")
+            seen_plte = True
+        elif chunk_type == b'IDAT':
+            if idat_closed:
+                issues.append(f"IDAT chunks are not consecutive (offset {offset})")
+            seen_idat = True
+            if not inflater.eof and inflate_error is None:
+                try:
+                    inflated += _inflate(inflater, body)
+                except zlib.error as e:
+                    inflate_error = f"Corrupt IDAT stream: {e}"
+                    issues.append(inflate_error)
+        elif chunk_type == b'IEND':
+            if body:
+                issues.append("IEND chunk has data")
+            seen_iend = True
+        elif seen_idat:
+            idat_closed = True
+
+    if info is None:
+        issues.append("No chunks after signature")
+        return None, issues
+    if info.color_type == 3 and not seen_plte:
+        issues.append("Indexed-color image has no PLTE chunk")
+    if not seen_idat:
+        issues.append("No IDAT chunk")
+    if not seen_iend:
+        issues.append("Missing IEND terminator (file truncated?)")
+
+    if seen_idat and inflate_error is None:
+        expected = info.expected_data_size()
+        if not inflater.eof:
+            issues.append("IDAT stream is incomplete")
+        if inflated != expected:
+            issues.append(f"IDAT inflates to {inflated} bytes (expected {expected})")
+    return info, issues
+
+
+def verify_png(path):
+    """Verify a PNG file's structure; returns (PNGInfo or None, list of issues)."""
+    path = Path(path)
+    size = path.stat().st_size
+    if size < len(PNG_SIGNATURE):
+        return None, [f"File too small ({size} bytes)"]
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = memoryview(mm)
+        try:
+            if data[:len(PNG_SIGNATURE)] != PNG_SIGNATURE:
+                return None, ["Not a PNG file (bad signature)"]
+            try:
+                return _check_chunks(data)
+            except ValueError as e:
+                return None, [str(e)]
+        finally:
+            # Views must be released before the mapping can close
+            data.release()
+
+
+def find_pngs(paths):
+    """Yield every .png under the given files or directories."""
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            yield from sorted(path.rglob('*.png'))
+        elif path.suffix.lower() == '.png':
+            yield path
+
+
+def main(argv=None):
+    parser = make_parser("Verify the structure of every PNG in the asset catalogs")
+    parser.add_argument('paths', nargs='*', help="files or directories (default: all .xcassets)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only report failures")
+    args = parse_args(parser, argv)
+
+    paths = args.paths or sorted(args.root.glob('**/*.xcassets'))
+    print_header("PNG Integrity")
+
+    checked = failed = 0
+    for png in find_pngs(paths):
+        checked += 1
+        _, issues = verify_png(png)
+        if issues:
+            failed += 1
+        if issues or not args.quiet:
+            print_result(str(png.relative_to(args.root) if png.is_relative_to(args.root) else png),
+                         not issues, "; ".join(issues))
+
+    color = RED if failed else GREEN
+    print(f"\n{color}{checked - failed}/{checked} PNG files intact{RESET}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Reconcile project.pbxproj against the files on disk.
+
+Two path sets are built once and compared in a single pass over each:
+- the project side: every file reference and group path (resolved through
+  the group hierarchy by pbxproj.reference_paths), every synchronized
+  folder, and the membership exceptions of each synchronized folder
+- the disk side: every file under the project directory, gathered by a
+  thread pool of os.scandir calls. Bundle-like directories (.xcassets,
+  .xcdatamodeld, ...) count as one resource.
+
+The report lists:
+- paths the project references that do not exist
+- source files on disk that no target compiles
+- resources on disk that the project does not contain at all
+- stray editor and backup files (*.backup, *.orig, *~, ...)
+
+Use it as a pre-commit hook so only problems in the commit block it:
+
+    printf '#!/bin/sh\\nexec python3 mcv.py reconcile --staged -q\\n' > .git/hooks/pre-commit
+    chmod +x .git/hooks/pre-commit
+
+With --staged, disk-side findings are limited to staged files. Missing
+references are always checked.
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+
+import pbxproj
+from mcv_common import (
+    GREEN, RED, RESET,
+    make_parser, parse_args, print_header, print_result,
+)
+
+PROJECT_FILE = Path('MCVenture.xcodeproj') / 'project.pbxproj'
+
+SOURCE_SUFFIXES = {'.swift', '.m', '.mm', '.c', '.cc', '.cpp', '.metal'}
+RESOURCE_SUFFIXES = {
+    '.storyboard', '.xib', '.strings', '.stringsdict', '.xcstrings', '.plist',
+    '.entitlements', '.xcprivacy', '.json', '.ttf', '.otf', '.png', '.jpg', '.jpeg',
+    '.pdf', '.mp3', '.wav', '.caf', '.gpx', '.intentdefinition', '.h',
+}
+# Directories Xcode treats as a single resource
+BUNDLE_SUFFIXES = {'.xcassets', '.xcdatamodeld', '.bundle', '.scnassets', '.xcframework',
+                   '.framework', '.docc', '.mlpackage'}
+SKIP_DIRS = {'.git', 'build', 'DerivedData', '.build', 'Pods', '__pycache__',
+             'xcuserdata', 'project.xcworkspace', '.swiftpm'}
+STRAY = re.compile(r'(\.(backup\d*|bak|orig|rej|old|new|tmp|swp)|~)$')
+
+
+def _scan_dir(root, relative):
+    """List one directory; returns (subdirectories to descend, files, bundles)."""
+    subdirs, files, bundles = [], [], []
+    prefix = f"{relative}/" if relative else ""
+    with os.scandir(os.path.join(root, relative)) as entries:
+        for entry in entries:
+            path = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if os.path.splitext(entry.name)[1] in BUNDLE_SUFFIXES:
+                    bundles.append(path)
+                elif entry.name not in SKIP_DIRS:
+                    subdirs.append(path)
+            else:
+                files.append(path)
+    return subdirs, files, bundles
+
+
+def walk_disk(root, jobs=None):
+    """Return (files, directories) under root as '/'-separated relative paths.
+
+    Directories are listed concurrently; each finished listing immediately
+    queues its subdirectories, so deep and wide trees both keep every
+    worker busy.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    files, directories = set(), set()
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        pending = {pool.submit(_scan_dir, root, '')}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    subdirs, names, bundles = future.result()
+                except OSError:
+                    continue
+                files.update(names)
+                files.update(bundles)
+                directories.update(subdirs)
+                pending.update(pool.submit(_scan_dir, root, d) for d in subdirs)
+    return files, directories
+
+
+class ProjectPaths:
+    """Everything project.pbxproj says about files, as project-relative paths."""
+
+    def __init__(self, project):
+        objects = project['objects']
+        paths = pbxproj.reference_paths(project)
+
+        self.files = {}       # path -> file reference ID
+        self.groups = set()   # group paths that must exist as directories
+        self.synced = {}      # synchronized folder path -> {target: excluded paths}
+        self.members = set()  # file reference IDs compiled or copied by a target
+
+        for object_id, path in paths.items():
+            path = os.path.normpath(path) if path else ''
+            if not path or path == '.':
+                continue
+            isa = objects[object_id].get('isa')
+            if isa == 'PBXFileReference':
+                self.files[path] = object_id
+            elif isa == 'PBXFileSystemSynchronizedRootGroup':
+                self.synced[path] = {}
+            elif isa in pbxproj.GROUP_ISAS and 'path' in objects[object_id]:
+                self.groups.add(path)
+
+        folder_paths = {object_id: os.path.normpath(path) for object_id, path in paths.items()}
+        for target_id in objects[project['rootObject']].get('targets', []):
+            target = objects.get(target_id, {})
+            name = target.get('name', target_id)
+            for phase_id in target.get('buildPhases', []):
+                for build_file_id in objects.get(phase_id, {}).get('files', []):
+                    # Package products (productRef) have no file reference
+                    ref = objects.get(build_file_id, {}).get('fileRef')
+                    if not ref:
+                        continue
+                    self.members.add(ref)
+                    self.members.update(objects.get(ref, {}).get('children', []))
+            for group_id in target.get('fileSystemSynchronizedGroups', []):
+                folder = folder_paths.get(group_id)
+                if folder in self.synced:
+                    self.synced[folder].setdefault(name, set())
+
+        # Exceptions hang off the synchronized folder and name their target
+        for group_id, folder in folder_paths.items():
+            if folder not in self.synced:
+                continue
+            for exception_id in objects[group_id].get('exceptions', []):
+                exception = objects.get(exception_id, {})
+                target = objects.get(exception.get('target'), {}).get('name')
+                excluded = self.synced[folder].get(target)
+                if excluded is None:
+                    continue
+                excluded.update(os.path.normpath(p) for p in exception.get('membershipExceptions', []))
+
+    def synced_folder(self, path):
+        """Return (folder, path inside it) for a path under a synchronized folder."""
+        parent = path
+        while True:
+            parent = os.path.dirname(parent)
+            if parent in self.synced:
+                return parent, path[len(parent) + 1:]
+            if not parent:
+                return None, None
+
+    def is_member(self, path):
+        """True if some target builds or copies the file at path."""
+        if path in self.files and self.files[path] in self.members:
+            return True
+        folder, inner = self.synced_folder(path)
+        if folder is None:
+            return False
+        for excluded in self.synced[folder].values():
+            if not any(inner == e or inner.startswith(e + '/') for e in excluded):
+                return True
+        return False
+
+    def contains(self, path):
+        """True if the project shows the file, whether or not a target uses it."""
+        if path in self.files:
+            return True
+        folder, _ = self.synced_folder(path)
+        return folder is not None
+
+
+def reconcile(root, jobs=None, only=None):
+    """Compare project and disk; returns {category: sorted paths}.
+
+    only, if given, is a set of paths that disk-side findings are limited to.
+    """
+    root = Path(root)
+    project = ProjectPaths(pbxproj.load(root / PROJECT_FILE))
+    files, directories = walk_disk(root, jobs)
+
+    def exists(path):
+        # Paths outside the walk (skipped directories, bundle contents, above
+        # the root) are rare, so only those cost a stat
+        return path in files or path in directories or (root / path).exists()
+
+    missing = [p for p in project.files if not exists(p)]
+    missing += [p for p in project.groups | set(project.synced) if not exists(p)]
+    for folder, targets in project.synced.items():
+        for excluded in targets.values():
+            missing += [f"{folder}/{p}" for p in excluded if not exists(f"{folder}/{p}")]
+
+    unbuilt, uncontained, strays = [], [], []
+    for path in files:
+        if only is not None and path not in only:
+            continue
+        if STRAY.search(path):
+            strays.append(path)
+            continue
+        suffix = os.path.splitext(path)[1]
+        if suffix in SOURCE_SUFFIXES:
+            if not project.is_member(path):
+                unbuilt.append(path)
+        elif suffix in RESOURCE_SUFFIXES or suffix in BUNDLE_SUFFIXES:
+            if not project.contains(path) and not path.startswith(str(PROJECT_FILE.parent) + '/'):
+                uncontained.append(path)
+
+    return {
+        'missing': sorted(set(missing)),
+        'unbuilt': sorted(unbuilt),
+        'uncontained': sorted(uncontained),
+        'strays': sorted(strays),
+    }
+
+
+def staged_paths(root):
+    """Paths added, copied, modified or renamed in the index, relative to root."""
+    import subprocess
+
+    result = subprocess.run(
+        ['git', '-C', str(root), 'diff', '--cached', '--name-only', '--relative',
+         '--diff-filter=ACMR', '-z'],
+        capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise OSError(result.stderr.strip() or "git diff failed")
+    staged = set(filter(None, result.stdout.split('\0')))
+    # A staged file inside a bundle stands for the bundle
+    for path in list(staged):
+        parts = path.split('/')
+        for i, part in enumerate(parts[:-1]):
+            if os.path.splitext(part)[1] in BUNDLE_SUFFIXES:
+                staged.add('/'.join(parts[:i + 1]))
+                break
+    return staged
+
+
+CATEGORIES = (
+    ('missing', "Project references exist on disk", "referenced but missing"),
+    ('unbuilt', "Source files belong to a target", "not compiled by any target"),
+    ('uncontained', "Resources are in the project", "not in the project"),
+    ('strays', "No stray backup files", "stray file"),
+)
+
+
+def main(argv=None):
+    parser = make_parser("Reconcile project.pbxproj against the files on disk")
+    parser.add_argument('--staged', action='store_true',
+                        help="limit disk-side findings to files staged for commit")
+    parser.add_argument('-j', '--jobs', type=int, help="directory listing threads")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only report failures")
+    args = parse_args(parser, argv)
+
+    try:
+        only = staged_paths(args.root) if args.staged else None
+        report = reconcile(args.root, args.jobs, only)
+    except (OSError, pbxproj.PBXParseError) as e:
+        print_result("Load project", False, str(e))
+        return 1
+
+    if not args.quiet:
+        print_header("Project vs Disk")
+    problems = 0
+    for key, title, label in CATEGORIES:
+        paths = report[key]
+        problems += len(paths)
+        if paths or not args.quiet:
+            print_result(title, not paths,
+                         "\n        ".join(f"{path} ({label})" for path in paths))
+
+    if problems or not args.quiet:
+        color = RED if problems else GREEN
+        print(f"\n{color}{problems} problem(s){RESET}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
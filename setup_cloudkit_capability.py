@@ -5,13 +5,15 @@ This modifies the project.pbxproj file to add the necessary capability attribute
 """
 
 import re
-import uuid
-import shutil
+import sys
 from pathlib import Path
 
+from mcv_common import make_parser, parse_args
+
 
 def generate_xcode_uuid():
     """Generate a 24-character hex UUID compatible with Xcode format."""
+    import uuid
     return uuid.uuid4().hex.upper()[:24]
 
 
@@ -26,6 +28,7 @@ def add_cloudkit_capability(pbxproj_path):
         content = f.read()
     
     # Backup original
+    import shutil
     backup_path = str(pbxproj_path) + '.backup2'
     shutil.copy2(pbxproj_path, backup_path)
     print(f"✅ Created backup: {backup_path}")
@@ -155,24 +158,34 @@ def add_cloudkit_capability(pbxproj_path):
     return True
 
 
-def verify_entitlements():
+def verify_entitlements(project_dir):
     """Verify the entitlements file exists and has correct content."""
-    entitlements_path = Path('/Users/bntf/Desktop/MCVenture/MCVenture/MCVenture.entitlements')
+    entitlements_path = Path(project_dir) / 'MCVenture' / 'MCVenture.entitlements'
     
     if not entitlements_path.exists():
         print(f"❌ Entitlements file not found: {entitlements_path}")
         return False
     
-    with open(entitlements_path, 'r') as f:
-        content = f.read()
-    
+    import plistlib
+
+    try:
+        with open(entitlements_path, 'rb') as f:
+            entitlements = plistlib.load(f)
+    except Exception as e:
+        print(f"❌ Could not parse entitlements file: {e}")
+        return False
+    if not isinstance(entitlements, dict):
+        print("❌ Entitlements file is not a dictionary plist")
+        return False
+
     required_keys = [
         'com.apple.developer.icloud-container-identifiers',
         'com.apple.developer.icloud-services',
-        'CloudKit'
     ]
     
-    missing = [key for key in required_keys if key not in content]
+    missing = [key for key in required_keys if key not in entitlements]
+    if 'CloudKit' not in entitlements.get('com.apple.developer.icloud-services', []):
+        missing.append('CloudKit service')
     if missing:
         print(f"⚠️  Entitlements file missing keys: {missing}")
         return False
@@ -181,22 +194,24 @@ def verify_entitlements():
     return True
 
 
-def main():
+def main(argv=None):
+    args = parse_args(make_parser("Add the iCloud/CloudKit capability to the Xcode project"), argv)
+
     print("=" * 60)
     print("CloudKit Capability Auto-Setup for MCVenture")
     print("=" * 60)
     
-    project_path = Path('/Users/bntf/Desktop/MCVenture/MCVenture.xcodeproj/project.pbxproj')
+    project_path = args.root / 'MCVenture.xcodeproj' / 'project.pbxproj'
     
     if not project_path.exists():
         print(f"❌ Project file not found: {project_path}")
-        return
+        return 1
     
     print(f"\n📁 Project: {project_path}")
     
     # Step 1: Verify entitlements
     print("\n📝 Step 1: Verifying entitlements file...")
-    verify_entitlements()
+    verify_entitlements(args.root)
     
     # Step 2: Add CloudKit capability to project
     print("\n⚙️  Step 2: Adding CloudKit capability to Xcode project...")
@@ -213,11 +228,13 @@ def main():
         print("   • Clean build folder (Cmd+Shift+K)")
         print("   • Close and reopen Xcode")
         print("   • The code will work even if UI doesn't show it immediately")
+        return 0
     else:
         print("\n❌ Failed to add CloudKit capability")
         print("Please add it manually in Xcode:")
         print("Target → Signing & Capabilities → + Capability → iCloud → CloudKit")
+        return 1
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -9,26 +9,12 @@ This tests the configuration files, not the runtime CloudKit functionality.
 import os
 import sys
 import re
-import plistlib
 from pathlib import Path
 
-# Colors for terminal output
-GREEN = '\033[92m'
-RED = '\033[91m'
-YELLOW = '\033[93m'
-BLUE = '\033[94m'
-RESET = '\033[0m'
-
-def print_header(text):
-    print(f"\n{BLUE}{'=' * 60}{RESET}")
-    print(f"{BLUE}{text}{RESET}")
-    print(f"{BLUE}{'=' * 60}{RESET}\n")
-
-def print_test(name, passed, message=""):
-    status = f"{GREEN}✅ PASS{RESET}" if passed else f"{RED}❌ FAIL{RESET}"
-    print(f"{status} - {name}")
-    if message:
-        print(f"        {message}")
+from mcv_common import (
+    BLUE, GREEN, RED, RESET, YELLOW,
+    make_parser, parse_args, print_banner, print_checks, print_header, print_result,
+)
 
 def test_project_structure():
     """Test 1: Verify project file structure exists"""
@@ -44,9 +30,22 @@ def test_project_structure():
     all_passed = True
     for name, path in tests:
         exists = Path(path).exists()
-        print_test(name, exists, path if exists else f"Missing: {path}")
+        print_result(name, exists, path if exists else f"Missing: {path}")
         all_passed = all_passed and exists
     
+    # Every file the project references must exist (see project_reconcile.py)
+    from pbxproj import PBXParseError
+    from project_reconcile import reconcile
+
+    try:
+        missing = reconcile(Path.cwd())['missing']
+    except (OSError, PBXParseError) as e:
+        print_result("Project references on disk", False, str(e))
+        return False
+    print_result("Project references on disk", not missing,
+                 f"Missing: {', '.join(missing)}" if missing else "")
+    all_passed = all_passed and not missing
+    
     return all_passed
 
 def test_entitlements_file():
@@ -56,9 +55,11 @@ def test_entitlements_file():
     entitlements_path = Path("MCVenture/MCVenture.entitlements")
     
     if not entitlements_path.exists():
-        print_test("Entitlements exists", False, "File not found")
+        print_result("Entitlements exists", False, "File not found")
         return False
     
+    import plistlib
+
     try:
         with open(entitlements_path, 'rb') as f:
             plist = plistlib.load(f)
@@ -72,14 +73,9 @@ def test_entitlements_file():
              any("iCloud." in str(item) for item in plist.get("com.apple.developer.icloud-container-identifiers", []))),
         ]
         
-        all_passed = True
-        for name, condition in tests:
-            print_test(name, condition)
-            all_passed = all_passed and condition
-        
-        return all_passed
+        return print_checks(tests)
     except Exception as e:
-        print_test("Parse entitlements", False, str(e))
+        print_result("Parse entitlements", False, str(e))
         return False
 
 def test_xcode_project():
@@ -89,37 +85,41 @@ def test_xcode_project():
     pbxproj_path = Path("MCVenture.xcodeproj/project.pbxproj")
     
     if not pbxproj_path.exists():
-        print_test("Project file exists", False)
+        print_result("Project file exists", False)
         return False
     
-    with open(pbxproj_path, 'r') as f:
-        content = f.read()
+    # Only the project object is parsed; build settings come memoized
+    from build_settings import BuildSettingsResolver
+    from pbxproj import PBXParseError
+    from pbxproj_index import ProjectIndex
+    
+    try:
+        with ProjectIndex(pbxproj_path) as project:
+            has_reference = project.contains_text('MCVenture.entitlements')
+            target_attributes = project.root.get('attributes', {}).get('TargetAttributes', {})
+        table = BuildSettingsResolver(Path.cwd()).table()
+    except (OSError, PBXParseError) as e:
+        print_result("Parse project", False, str(e))
+        return False
+    entitlements = [settings.get('CODE_SIGN_ENTITLEMENTS')
+                    for configs in table.values() for settings in configs.values()]
+    
+    capabilities = [attrs.get('SystemCapabilities', {}) for attrs in target_attributes.values()]
+    enabled = {name for caps in capabilities for name, cap in caps.items()
+               if isinstance(cap, dict) and cap.get('enabled') == '1'}
     
     tests = [
-        ("Entitlements reference", 'MCVenture.entitlements' in content),
-        ("CODE_SIGN_ENTITLEMENTS", 'CODE_SIGN_ENTITLEMENTS' in content),
-        ("TargetAttributes section", 'TargetAttributes' in content),
-        ("iCloud capability", 'com.apple.iCloud' in content),
-        ("CloudKit capability", 'com.apple.CloudKit' in content),
-        ("SystemCapabilities", 'SystemCapabilities' in content),
-        ("Capability enabled", 'enabled = 1' in content),
+        ("Entitlements reference", has_reference),
+        ("CODE_SIGN_ENTITLEMENTS", any(entitlements)),
+        ("TargetAttributes section", bool(target_attributes)),
+        ("iCloud capability", any('com.apple.iCloud' in caps for caps in capabilities)),
+        ("CloudKit capability", any('com.apple.CloudKit' in caps for caps in capabilities)),
+        ("SystemCapabilities", any('SystemCapabilities' in attrs for attrs in target_attributes.values())),
+        ("Capability enabled", bool(enabled)),
+        ("Capability structure", bool(enabled & {'com.apple.iCloud', 'com.apple.CloudKit'})),
     ]
     
-    all_passed = True
-    for name, condition in tests:
-        print_test(name, condition)
-        all_passed = all_passed and condition
-    
-    # Check for proper capability structure
-    has_proper_structure = re.search(
-        r'SystemCapabilities\s*=\s*{.*com\.apple\.(iCloud|CloudKit).*enabled\s*=\s*1',
-        content,
-        re.DOTALL
-    )
-    print_test("Capability structure", has_proper_structure is not None)
-    all_passed = all_passed and (has_proper_structure is not None)
-    
-    return all_passed
+    return print_checks(tests)
 
 def test_cloudkit_manager():
     """Test 4: Verify CloudKit manager implementation"""
@@ -128,7 +128,7 @@ def test_cloudkit_manager():
     manager_path = Path("MCVenture/Managers/CloudKitSyncManager.swift")
     
     if not manager_path.exists():
-        print_test("Manager file exists", False)
+        print_result("Manager file exists", False)
         return False
     
     with open(manager_path, 'r') as f:
@@ -146,12 +146,7 @@ def test_cloudkit_manager():
         ("Retry logic", 'RetryManager' in content or 'retry' in content.lower()),
     ]
     
-    all_passed = True
-    for name, condition in tests:
-        print_test(name, condition)
-        all_passed = all_passed and condition
-    
-    return all_passed
+    return print_checks(tests)
 
 def test_community_view():
     """Test 5: Verify Community Routes View implementation"""
@@ -160,7 +155,7 @@ def test_community_view():
     view_path = Path("MCVenture/Views/CommunityRoutesView.swift")
     
     if not view_path.exists():
-        print_test("View file exists", False)
+        print_result("View file exists", False)
         return False
     
     with open(view_path, 'r') as f:
@@ -177,17 +172,22 @@ def test_community_view():
         ("Unique struct names", 'CommunityRouteRowView' in content and 'CommunityShareRouteView' in content),
     ]
     
-    all_passed = True
-    for name, condition in tests:
-        print_test(name, condition)
-        all_passed = all_passed and condition
-    
-    return all_passed
+    return print_checks(tests)
 
-def test_build_compiles():
+def test_build_compiles(args=None):
     """Test 6: Verify project builds successfully"""
     print_header("Test 6: Build Verification")
     
+    if args is not None and args.matrix:
+        import build_matrix
+        
+        print("Building every destination concurrently...\n")
+        results, wall_time = build_matrix.matrix_from_args(args)
+        if not results:
+            print_result("Build succeeds", False, "No destination matches a scheme in the project")
+            return False
+        return build_matrix.report(results, wall_time)
+    
     print("Building project for iOS Simulator...")
     print("(This may take 30-60 seconds)\n")
     
@@ -195,16 +195,16 @@ def test_build_compiles():
     
     try:
         result = subprocess.run([
-            'xcodebuild',
+            os.environ.get('XCODEBUILD', 'xcodebuild'),
             '-project', 'MCVenture.xcodeproj',
             '-scheme', 'MCVenture',
-            '-destination', 'platform=iOS Simulator,id=ECB93BA1-C363-4DC5-A5C9-452405D9B406',
+            '-destination', 'generic/platform=iOS Simulator',
             'build',
             '-quiet'
         ], capture_output=True, text=True, timeout=120)
         
         success = result.returncode == 0
-        print_test("Build succeeds", success, 
+        print_result("Build succeeds", success, 
                    "✓ No compilation errors" if success else "Build failed - check errors")
         
         if not success and result.stderr:
@@ -213,20 +213,30 @@ def test_build_compiles():
         
         return success
     except subprocess.TimeoutExpired:
-        print_test("Build succeeds", False, "Build timed out after 120 seconds")
+        print_result("Build succeeds", False, "Build timed out after 120 seconds")
         return False
     except Exception as e:
-        print_test("Build succeeds", False, str(e))
+        print_result("Build succeeds", False, str(e))
         return False
 
-def main():
+def main(argv=None):
     """Run all tests"""
+    argv = sys.argv[1:] if argv is None else argv
+    parser = make_parser("Verify the CloudKit configuration of the Xcode project")
+    parser.add_argument('--matrix', action='store_true',
+                        help="build every destination concurrently; takes the options "
+                             "of build_matrix.py (--jobs, --timeout, --fail-fast, ...)")
+    # build_matrix pulls in asyncio, so only load it when the matrix is wanted
+    if '--matrix' in argv:
+        from build_matrix import add_matrix_arguments
+        add_matrix_arguments(parser)
+    args = parse_args(parser, argv)
+
     print_header("CloudKit Configuration Test Suite")
     print(f"{BLUE}Testing MCVenture CloudKit Setup{RESET}\n")
     
     # Change to project directory
-    project_dir = Path(__file__).parent
-    os.chdir(project_dir)
+    os.chdir(args.root)
     
     results = {
         "Project Structure": test_project_structure(),
@@ -234,7 +244,7 @@ def main():
         "Xcode Configuration": test_xcode_project(),
         "CloudKit Manager": test_cloudkit_manager(),
         "Community View": test_community_view(),
-        "Build": test_build_compiles(),
+        "Build": test_build_compiles(args),
     }
     
     # Summary
@@ -250,9 +260,7 @@ def main():
     print(f"\n{BLUE}Results: {passed}/{total} tests passed{RESET}\n")
     
     if passed == total:
-        print(f"{GREEN}{'=' * 60}{RESET}")
-        print(f"{GREEN}🎉 ALL TESTS PASSED! CloudKit is properly configured.{RESET}")
-        print(f"{GREEN}{'=' * 60}{RESET}")
+        print_banner("🎉 ALL TESTS PASSED! CloudKit is properly configured.", GREEN)
         print(f"\n{BLUE}Next Steps:{RESET}")
         print("1. Connect your iPhone/iPad to your Mac")
         print("2. Open MCVenture.xcodeproj in Xcode")
@@ -261,9 +269,8 @@ def main():
         print("5. Test uploading/downloading routes in the Community section\n")
         return 0
     else:
-        print(f"{RED}{'=' * 60}{RESET}")
-        print(f"{RED}⚠️  Some tests failed. Review the output above.{RESET}")
-        print(f"{RED}{'=' * 60}{RESET}\n")
+        print_banner("⚠️  Some tests failed. Review the output above.", RED)
+        print()
         return 1
 
 if __name__ == '__main__':
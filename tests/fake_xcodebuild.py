@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Stand-in for xcodebuild used to exercise build_matrix without Xcode.
+
+The destination name is taken from the last component of -derivedDataPath,
+which build_matrix sets to <derived root>/<name>. Behaviour per name comes
+from $FAKE_XCODEBUILD_PLAN, a JSON object such as
+
+    {"iphone": {"sleep": 0.5, "exit": 0}, "watch": {"sleep": 0.1, "exit": 65}}
+
+Names missing from the plan sleep $FAKE_XCODEBUILD_SLEEP seconds (default
+0) and exit 0. If $FAKE_XCODEBUILD_LOG names a directory, '<name> start'
+and '<name> end' lines with wall-clock timestamps are appended to a file
+there, so tests can measure how many builds overlapped.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def main(argv):
+    name = 'unknown'
+    if '-derivedDataPath' in argv:
+        name = os.path.basename(argv[argv.index('-derivedDataPath') + 1])
+
+    plan = json.loads(os.environ.get('FAKE_XCODEBUILD_PLAN', '{}')).get(name, {})
+    delay = float(plan.get('sleep', os.environ.get('FAKE_XCODEBUILD_SLEEP', 0)))
+    code = int(plan.get('exit', 0))
+
+    log_dir = os.environ.get('FAKE_XCODEBUILD_LOG')
+
+    def log(event):
+        if log_dir:
+            with open(os.path.join(log_dir, 'events.log'), 'a') as f:
+                f.write(f"{name} {event} {time.time()!r}\n")
+
+    log('start')
+    print(f"fake xcodebuild: building {name} for {delay}s", flush=True)
+    time.sleep(delay)
+    log('end')
+    if code:
+        print(f"fake xcodebuild: {name} failed with exit code {code}")
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,157 @@
+import os
+import struct
+import zlib
+
+from asset_duplicates import (
+    asset_symbol, duplicate_groups, find_assets, pixel_digest, scan, unreferenced_imagesets,
+    wasted_bytes,
+)
+from png_integrity import ADAM7
+
+COPY_SIZE = 533 * 1024
+
+
+def add_image(root, target, name, data):
+    imageset = root / target / 'Assets.xcassets' / f'{name}.imageset'
+    imageset.mkdir(parents=True)
+    (imageset / f'{name}.jpg').write_bytes(data)
+
+
+def test_cross_target_copies_are_wasted(tmp_path):
+    artwork = os.urandom(COPY_SIZE)
+    for target in ('MCVenture', 'MCVentureWatch', 'MCVentureWidgets'):
+        add_image(tmp_path, target, 'RouteMap', artwork)
+    add_image(tmp_path, 'MCVenture', 'Logo', os.urandom(1024))
+
+    assets, _ = find_assets(tmp_path)
+    groups = duplicate_groups(scan(assets, jobs=2))
+
+    assert [len(group) for group in groups] == [3]
+    wasted = wasted_bytes(groups)
+    assert sum(wasted.values()) == 2 * COPY_SIZE
+    assert 'MCVenture' not in wasted
+
+
+def test_same_target_copies_are_wasted(tmp_path):
+    artwork = os.urandom(4096)
+    add_image(tmp_path, 'MCVenture', 'Badge', artwork)
+    add_image(tmp_path, 'MCVenture', 'BadgeCopy', artwork)
+
+    assets, _ = find_assets(tmp_path)
+
+    assert wasted_bytes(duplicate_groups(scan(assets, jobs=2))) == {'MCVenture': 4096}
+
+
+WIDTH, HEIGHT = 9, 7
+COLORS = [(200, 30, 30), (30, 200, 30), (30, 30, 200), (250, 250, 250)]
+PIXELS = [[COLORS[(x * y + x) % 4] for x in range(WIDTH)] for y in range(HEIGHT)]
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+
+def _filter(rows, bpp, filters):
+    """Filter raw scanlines, choosing each row's filter type from filters."""
+    out = bytearray()
+    prior = bytes(len(rows[0])) if rows else b''
+    for y, row in enumerate(rows):
+        kind = filters[y % len(filters)]
+        filtered = bytearray(len(row))
+        for i, x in enumerate(row):
+            a = row[i - bpp] if i >= bpp else 0
+            b = prior[i]
+            c = prior[i - bpp] if i >= bpp else 0
+            predictor = (0, a, b, (a + b) >> 1, _paeth(a, b, c))[kind]
+            filtered[i] = (x - predictor) & 0xFF
+        out += bytes([kind]) + filtered
+        prior = row
+    return out
+
+
+def encode_png(pixels, color_type, filters=(0,), level=6, interlace=0):
+    """Encode rows of RGB tuples as an 8-bit PNG of the given color type."""
+    palette = sorted({p for row in pixels for p in row})
+
+    def sample(pixel):
+        if color_type == 2:
+            return bytes(pixel)
+        if color_type == 6:
+            return bytes(pixel) + b'\xff'
+        return bytes([palette.index(pixel)])
+
+    bpp = {2: 3, 3: 1, 6: 4}[color_type]
+    height, width = len(pixels), len(pixels[0])
+    if interlace:
+        raw = bytearray()
+        for x0, y0, dx, dy in ADAM7:
+            rows = [b''.join(sample(pixels[y][x]) for x in range(x0, width, dx))
+                    for y in range(y0, height, dy)]
+            rows = [row for row in rows if row]
+            if rows:
+                raw += _filter(rows, bpp, filters)
+    else:
+        raw = _filter([b''.join(map(sample, row)) for row in pixels], bpp, filters)
+
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    chunks = [chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, interlace))]
+    if color_type == 3:
+        chunks.append(chunk(b'PLTE', b''.join(bytes(p) for p in palette)))
+    chunks += [chunk(b'IDAT', zlib.compress(bytes(raw), level)), chunk(b'IEND', b'')]
+    return b'\x89PNG\r\n\x1a\n' + b''.join(chunks)
+
+
+def add_png(root, target, name, data):
+    imageset = root / target / 'Assets.xcassets' / f'{name}.imageset'
+    imageset.mkdir(parents=True)
+    (imageset / f'{name}.png').write_bytes(data)
+    return imageset / f'{name}.png'
+
+
+def test_re_encoded_pngs_match_by_pixels(tmp_path):
+    variants = {
+        'Rgb': encode_png(PIXELS, 2, filters=(0, 1, 2, 3, 4), level=1),
+        'Rgba': encode_png(PIXELS, 6, filters=(4,), level=9),
+        'Indexed': encode_png(PIXELS, 3, filters=(1, 3)),
+        'Interlaced': encode_png(PIXELS, 2, filters=(3, 2), interlace=1),
+    }
+    paths = [add_png(tmp_path, 'MCVenture', name, data) for name, data in variants.items()]
+    different = [row[:] for row in PIXELS]
+    different[3][4] = (0, 0, 0)
+    add_png(tmp_path, 'MCVentureWatch', 'Other', encode_png(different, 2))
+
+    assert len({pixel_digest(path) for path in paths}) == 1
+    assert None not in {pixel_digest(path) for path in paths}
+
+    assets, _ = find_assets(tmp_path)
+    groups = duplicate_groups(scan(assets, jobs=2))
+
+    assert len(groups) == 1
+    assert sorted(a.path.stem for a in groups[0]) == sorted(variants)
+    # Distinct bytes in one group is what main reports as "identical pixels"
+    assert len({a.digest for a in groups[0]}) == len(variants)
+
+
+def test_asset_symbol():
+    assert asset_symbol('MotorcycleLogo') == 'motorcycleLogo'
+    assert asset_symbol('route-badge_v2') == 'routeBadgeV2'
+    assert asset_symbol('3D Map') == '_3DMap'
+    assert asset_symbol('---') is None
+
+
+def test_imageset_referenced_only_by_generated_symbol(tmp_path):
+    for name in ('MotorcycleLogo', 'RouteBadge', 'Unused', 'UnusedDark'):
+        add_image(tmp_path, 'MCVenture', name, name.encode())
+    (tmp_path / 'MCVenture' / 'Header.swift').write_text(
+        'Image(.motorcycleLogo)\n'
+        'Image("RouteBadge")\n'
+        '// .unusedDarkMode is a different symbol\n'
+    )
+
+    _, imagesets = find_assets(tmp_path)
+
+    assert unreferenced_imagesets(tmp_path, imagesets) == ['Unused', 'UnusedDark']
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import signal
+import time
+from pathlib import Path
+
+import pytest
+
+import build_matrix
+
+FAKE_XCODEBUILD = str(Path(__file__).with_name('fake_xcodebuild.py'))
+
+DESTINATIONS = {name: ('MCVenture', 'generic/platform=iOS Simulator')
+                for name in ('one', 'two', 'three', 'four')}
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """Run the matrix against the fake xcodebuild with a per-name plan."""
+    log_dir = tmp_path / 'log'
+    log_dir.mkdir()
+    monkeypatch.setenv('FAKE_XCODEBUILD_LOG', str(log_dir))
+
+    def run(plan, names=tuple(DESTINATIONS), **kwargs):
+        monkeypatch.setenv('FAKE_XCODEBUILD_PLAN', json.dumps(plan))
+        start = time.monotonic()
+        results = build_matrix.run_matrix(
+            list(names),
+            project_dir=tmp_path,
+            derived_root=tmp_path / 'derived',
+            xcodebuild=FAKE_XCODEBUILD,
+            destinations=DESTINATIONS,
+            **kwargs,
+        )
+        return {r.name: r for r in results}, time.monotonic() - start
+
+    run.log = log_dir / 'events.log'
+    return run
+
+
+def max_overlap(log):
+    """Largest number of fake builds running at the same moment."""
+    events = []
+    for line in log.read_text().splitlines():
+        _, event, stamp = line.split()
+        events.append((float(stamp), 1 if event == 'start' else -1))
+    running = peak = 0
+    for _, delta in sorted(events):
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def test_concurrency_is_bounded_by_jobs(run):
+    plan = {name: {'sleep': 0.3} for name in DESTINATIONS}
+
+    results, _ = run(plan, jobs=2)
+
+    assert all(r.passed for r in results.values())
+    assert max_overlap(run.log) == 2
+
+
+def test_wall_time_tracks_slowest_build(run):
+    plan = {'one': {'sleep': 0.3}, 'two': {'sleep': 0.3}, 'three': {'sleep': 0.3},
+            'four': {'sleep': 1.0}}
+
+    results, wall_time = run(plan, jobs=4)
+
+    total = sum(r.duration for r in results.values())
+    assert all(r.passed for r in results.values())
+    assert total >= 1.9
+    assert 1.0 <= wall_time < 1.6
+
+
+def test_results_keep_input_order_and_exit_codes(run):
+    plan = {'one': {'sleep': 0.3}, 'two': {'exit': 65}}
+
+    results, _ = run(plan, names=('one', 'two'), jobs=2)
+
+    assert list(results) == ['one', 'two']
+    assert results['one'].passed
+    assert results['two'].status == 'failed'
+    assert results['two'].returncode == 65
+
+
+def test_timeout_kills_only_the_slow_build(run):
+    plan = {'one': {'sleep': 30}, 'two': {'sleep': 0.2}}
+
+    results, wall_time = run(plan, names=('one', 'two'), jobs=2, timeout=0.5)
+
+    assert results['one'].status == 'timeout'
+    assert results['two'].passed
+    assert wall_time < 5
+
+
+def test_fail_fast_cancels_remaining_builds(run):
+    plan = {'one': {'sleep': 0.1, 'exit': 1}, 'two': {'sleep': 30}, 'three': {'sleep': 30},
+            'four': {'sleep': 30}}
+
+    results, wall_time = run(plan, jobs=2, fail_fast=True)
+
+    assert results['one'].status == 'failed'
+    assert {results[name].status for name in ('two', 'three', 'four')} == {'cancelled'}
+    assert wall_time < 5
+
+
+def test_default_names_follow_project_schemes(tmp_path):
+    schemes = tmp_path / build_matrix.PROJECT_FILE / 'xcshareddata' / 'xcschemes'
+    schemes.mkdir(parents=True)
+    (schemes / 'MCVenture.xcscheme').write_text('<Scheme/>')
+
+    assert build_matrix.default_names(tmp_path) == ['iphone', 'ipad', 'macos']
+
+    (schemes / 'MCVentureWatch.xcscheme').write_text('<Scheme/>')
+    assert 'watch' in build_matrix.default_names(tmp_path)
+
+
+def test_cancel_while_spawning_kills_the_child(tmp_path, monkeypatch):
+    monkeypatch.setenv('FAKE_XCODEBUILD_PLAN', json.dumps({'one': {'sleep': 30}}))
+    spawned = []
+    real_spawn = asyncio.create_subprocess_exec
+
+    async def slow_spawn(*args, **kwargs):
+        # The child is running before the spawn coroutine returns
+        proc = await real_spawn(*args, **kwargs)
+        spawned.append(proc)
+        await asyncio.sleep(0.3)
+        return proc
+
+    monkeypatch.setattr(asyncio, 'create_subprocess_exec', slow_spawn)
+
+    async def scenario():
+        task = asyncio.ensure_future(build_matrix.run_build(
+            'one', *DESTINATIONS['one'],
+            project_dir=tmp_path,
+            derived_root=tmp_path / 'derived',
+            semaphore=asyncio.Semaphore(1),
+            timeout=30,
+            xcodebuild=FAKE_XCODEBUILD,
+        ))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+    assert spawned[0].returncode == -signal.SIGKILL
@@ -0,0 +1,184 @@
+import pbxproj
+from build_settings import (
+    PROJECT_FILE, BuildSettingsResolver, apply_layer, expand_all, read_xcconfig, resolve_project,
+)
+from entitlements_check import collect_target_configs
+
+ROOT = 'AAAAAAAAAAAAAAAAAAAAAAA0'
+GROUP = 'AAAAAAAAAAAAAAAAAAAAAAA1'
+XCCONFIG = 'AAAAAAAAAAAAAAAAAAAAAAA2'
+TARGET_XCCONFIG = 'AAAAAAAAAAAAAAAAAAAAAAA3'
+PROJECT_LIST = 'BBBBBBBBBBBBBBBBBBBBBBB0'
+PROJECT_DEBUG = 'BBBBBBBBBBBBBBBBBBBBBBB1'
+TARGET = 'CCCCCCCCCCCCCCCCCCCCCCC0'
+TARGET_LIST = 'CCCCCCCCCCCCCCCCCCCCCCC1'
+TARGET_DEBUG = 'CCCCCCCCCCCCCCCCCCCCCCC2'
+
+
+def write_project(root):
+    project = {
+        'archiveVersion': '1',
+        'objectVersion': '56',
+        'rootObject': ROOT,
+        'objects': {
+            ROOT: {'isa': 'PBXProject', 'mainGroup': GROUP, 'targets': [TARGET],
+                   'buildConfigurationList': PROJECT_LIST},
+            GROUP: {'isa': 'PBXGroup', 'children': [XCCONFIG], 'sourceTree': '<group>'},
+            XCCONFIG: {'isa': 'PBXFileReference', 'path': 'Base.xcconfig', 'sourceTree': '<group>'},
+            PROJECT_LIST: {'isa': 'XCConfigurationList', 'buildConfigurations': [PROJECT_DEBUG]},
+            PROJECT_DEBUG: {'isa': 'XCBuildConfiguration', 'name': 'Debug',
+                            'baseConfigurationReference': XCCONFIG, 'buildSettings': {}},
+            TARGET: {'isa': 'PBXNativeTarget', 'name': 'MCVenture',
+                     'productType': 'com.apple.product-type.application',
+                     'buildConfigurationList': TARGET_LIST},
+            TARGET_LIST: {'isa': 'XCConfigurationList', 'buildConfigurations': [TARGET_DEBUG]},
+            TARGET_DEBUG: {'isa': 'XCBuildConfiguration', 'name': 'Debug', 'buildSettings': {
+                'CODE_SIGN_ENTITLEMENTS': 'MCVenture/MCVenture.entitlements',
+            }},
+        },
+    }
+    path = root / PROJECT_FILE
+    path.parent.mkdir(parents=True)
+    pbxproj.dump(project, path)
+
+
+def test_missing_include_is_watched(tmp_path):
+    write_project(tmp_path)
+    (tmp_path / 'Base.xcconfig').write_text('#include? "Local.xcconfig"\nSWIFT_VERSION = 5.0\n')
+
+    resolver = BuildSettingsResolver(tmp_path)
+    assert resolver.get('MCVenture', 'Debug', 'SWIFT_VERSION') == '5.0'
+    assert resolver.get('MCVenture', 'Debug', 'DEVELOPMENT_TEAM') is None
+
+    # Creating the optional include must invalidate both memo and disk cache
+    (tmp_path / 'Local.xcconfig').write_text('DEVELOPMENT_TEAM = ABCDE12345\n')
+    assert resolver.get('MCVenture', 'Debug', 'DEVELOPMENT_TEAM') == 'ABCDE12345'
+    assert BuildSettingsResolver(tmp_path).get('MCVenture', 'Debug', 'DEVELOPMENT_TEAM') == 'ABCDE12345'
+
+
+def test_entitlements_check_reads_memoized_settings(tmp_path, monkeypatch):
+    write_project(tmp_path)
+    (tmp_path / 'Base.xcconfig').write_text('SWIFT_VERSION = 5.0\n')
+    resolver = BuildSettingsResolver(tmp_path)
+    resolver.table()
+
+    def fail(*args):
+        raise AssertionError("settings resolved again")
+
+    monkeypatch.setattr('build_settings.resolve_project', fail)
+    configs = collect_target_configs(tmp_path, resolver)
+    assert [(c.target, c.role, c.configuration, c.entitlements_path) for c in configs] == [
+        ('MCVenture', 'app', 'Debug', 'MCVenture/MCVenture.entitlements'),
+    ]
+    # A fresh resolver is served from build/build_settings.json
+    assert len(collect_target_configs(tmp_path)) == 1
+
+
+def test_apply_layer_inherits_strings_and_lists():
+    settings = {'FLAGS': '-a', 'PATHS': ['one', 'two']}
+
+    apply_layer(settings, {'FLAGS': '$(inherited) -b', 'PATHS': ['$(inherited)', 'three'],
+                           'NEW': '${inherited} -c'})
+
+    assert settings == {'FLAGS': '-a -b', 'PATHS': ['one', 'two', 'three'], 'NEW': '-c'}
+    # A string lower layer is split when a list inherits it
+    assert apply_layer({'PATHS': 'one two'}, {'PATHS': ['$(inherited)', 'x']}) == {
+        'PATHS': ['one', 'two', 'x'],
+    }
+
+
+def test_apply_layer_keeps_inherited_for_lower_layers():
+    layer = apply_layer({}, {'FLAGS': '$(inherited) -b'}, keep_inherited=True)
+
+    assert layer == {'FLAGS': '$(inherited) -b'}
+    assert apply_layer({'FLAGS': '-a'}, layer) == {'FLAGS': '-a -b'}
+
+
+def test_expand_all_modifiers():
+    settings = expand_all({
+        'PRODUCT_NAME': 'MC Venture',
+        'LOWER': '$(PRODUCT_NAME:lower)',
+        'UPPER': '${PRODUCT_NAME:upper}',
+        'BUNDLE': 'com.example.$(PRODUCT_NAME:rfc1034identifier)',
+        'MODULE': '$(PRODUCT_NAME:c99extidentifier)',
+        'PLIST': 'App/Info.plist',
+        'PARTS': '$(PLIST:dir) $(PLIST:file) $(PLIST:base)',
+        'FALLBACK': '$(UNSET:default=none) [$(UNSET)]',
+        'CHAINED': '$(LOWER:upper)',
+        'LIST': ['$(PRODUCT_NAME:lower)', 'x'],
+    })
+
+    assert settings['LOWER'] == 'mc venture'
+    assert settings['UPPER'] == 'MC VENTURE'
+    assert settings['BUNDLE'] == 'com.example.MC-Venture'
+    assert settings['MODULE'] == 'MC_Venture'
+    assert settings['PARTS'] == 'App Info.plist Info'
+    assert settings['FALLBACK'] == 'none []'
+    assert settings['CHAINED'] == 'MC VENTURE'
+    assert settings['LIST'] == ['mc venture', 'x']
+
+
+def test_expand_all_breaks_cycles():
+    settings = expand_all({'A': '$(B)a', 'B': '$(A)b', 'SELF': '$(SELF) x'})
+
+    assert settings == {'A': 'ba', 'B': 'b', 'SELF': ' x'}
+
+
+def test_read_xcconfig_follows_include_chain(tmp_path):
+    (tmp_path / 'Base.xcconfig').write_text(
+        '#include "Shared/Common.xcconfig"\n'
+        '#include? "Missing.xcconfig"\n'
+        'FLAGS = $(inherited) -base // trailing comment\n'
+        'SDK_ONLY[sdk=iphoneos*] = ignored\n'
+    )
+    (tmp_path / 'Shared').mkdir()
+    (tmp_path / 'Shared' / 'Common.xcconfig').write_text(
+        '#include "Deep.xcconfig"\nFLAGS = $(inherited) -common\n'
+    )
+    (tmp_path / 'Shared' / 'Deep.xcconfig').write_text(
+        '#include "Common.xcconfig"\nFLAGS = -deep\nDEEP = yes;\n'
+    )
+    inputs = []
+
+    layer = read_xcconfig(tmp_path / 'Base.xcconfig', inputs)
+
+    assert layer == {'FLAGS': '-deep -common -base', 'DEEP': 'yes'}
+    assert [p.name for p in inputs] == [
+        'Base.xcconfig', 'Common.xcconfig', 'Deep.xcconfig', 'Missing.xcconfig',
+    ]
+
+
+def test_resolve_project_layers_in_xcode_order(tmp_path):
+    objects = {
+        ROOT: {'isa': 'PBXProject', 'mainGroup': GROUP, 'targets': [TARGET],
+               'buildConfigurationList': PROJECT_LIST},
+        GROUP: {'isa': 'PBXGroup', 'children': [XCCONFIG, TARGET_XCCONFIG], 'sourceTree': '<group>'},
+        XCCONFIG: {'isa': 'PBXFileReference', 'path': 'Project.xcconfig', 'sourceTree': '<group>'},
+        TARGET_XCCONFIG: {'isa': 'PBXFileReference', 'path': 'Target.xcconfig',
+                          'sourceTree': '<group>'},
+        PROJECT_LIST: {'isa': 'XCConfigurationList', 'buildConfigurations': [PROJECT_DEBUG]},
+        PROJECT_DEBUG: {'isa': 'XCBuildConfiguration', 'name': 'Debug',
+                        'baseConfigurationReference': XCCONFIG,
+                        'buildSettings': {'ORDER': '$(inherited) project', 'ONLY_PROJECT': 'p'}},
+        TARGET: {'isa': 'PBXNativeTarget', 'name': 'MCVenture', 'buildConfigurationList': TARGET_LIST},
+        TARGET_LIST: {'isa': 'XCConfigurationList', 'buildConfigurations': [TARGET_DEBUG]},
+        TARGET_DEBUG: {'isa': 'XCBuildConfiguration', 'name': 'Debug',
+                       'baseConfigurationReference': TARGET_XCCONFIG,
+                       'buildSettings': {
+                           'ORDER': '$(inherited) target',
+                           'DEFINES': ['$(inherited)', 'TARGET=1'],
+                           'BUNDLE': 'com.example.$(TARGET_NAME:lower).$(CONFIGURATION)',
+                       }},
+    }
+    (tmp_path / 'Project.xcconfig').write_text('ORDER = project-xcconfig\nDEFINES = DEBUG=1\n')
+    (tmp_path / 'Target.xcconfig').write_text('ORDER = $(inherited) target-xcconfig\n')
+    project = {'archiveVersion': '1', 'objectVersion': '56', 'rootObject': ROOT, 'objects': objects}
+
+    table, inputs = resolve_project(project, tmp_path)
+
+    settings = table['MCVenture']['Debug']
+    assert settings['ORDER'] == 'project-xcconfig project target-xcconfig target'
+    assert settings['DEFINES'] == ['DEBUG=1', 'TARGET=1']
+    assert settings['ONLY_PROJECT'] == 'p'
+    assert settings['BUNDLE'] == 'com.example.mcventure.Debug'
+    assert [p.name for p in inputs] == ['Project.xcconfig', 'Target.xcconfig']
@@ -0,0 +1,214 @@
+import plistlib
+
+import pbxproj
+from build_settings import PROJECT_FILE
+from entitlements_check import (
+    ICLOUD_CONTAINERS, ICLOUD_SERVICES, UBIQUITY_CONTAINERS,
+    PlistCache, TargetConfig, check_project, collect_target_configs,
+    rule_configurations_agree, rule_ubiquity_subset,
+)
+
+APPLICATION = 'com.apple.product-type.application'
+APP_EXTENSION = 'com.apple.product-type.app-extension'
+WIDGET_INFO = {'NSExtension': {'NSExtensionPointIdentifier': 'com.apple.widgetkit-extension'}}
+
+
+def write_project(root, targets):
+    """targets: [(name, productType, build settings)], each with a Debug configuration."""
+    ids = (f"{n:024X}" for n in range(1, 1000))
+    root_id, group_id = next(ids), next(ids)
+    objects = {group_id: {'isa': 'PBXGroup', 'children': [], 'sourceTree': '<group>'}}
+    target_ids = []
+    for name, product_type, settings in targets:
+        target_id, list_id, config_id = next(ids), next(ids), next(ids)
+        objects[target_id] = {'isa': 'PBXNativeTarget', 'name': name, 'productType': product_type,
+                              'buildConfigurationList': list_id}
+        objects[list_id] = {'isa': 'XCConfigurationList', 'buildConfigurations': [config_id]}
+        objects[config_id] = {'isa': 'XCBuildConfiguration', 'name': 'Debug', 'buildSettings': settings}
+        target_ids.append(target_id)
+    objects[root_id] = {'isa': 'PBXProject', 'mainGroup': group_id, 'targets': target_ids}
+
+    path = root / PROJECT_FILE
+    path.parent.mkdir(parents=True)
+    pbxproj.dump({'archiveVersion': '1', 'objectVersion': '56', 'rootObject': root_id,
+                  'objects': objects}, path)
+
+
+def write_plist(root, relative, value):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(plistlib.dumps(value))
+
+
+def icloud(*containers):
+    return {ICLOUD_CONTAINERS: list(containers), ICLOUD_SERVICES: ['CloudKit']}
+
+
+def app_and_watch(root, watch_containers, companion='com.x.app'):
+    write_project(root, [
+        ('App', APPLICATION, {'SDKROOT': 'iphoneos', 'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app',
+                              'CODE_SIGN_ENTITLEMENTS': 'App/App.entitlements'}),
+        # Single-target watch app: a plain application built for watchOS
+        ('Watch', APPLICATION, {'SDKROOT': 'watchos',
+                                'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app.watchkitapp',
+                                'CODE_SIGN_ENTITLEMENTS': 'Watch/Watch.entitlements',
+                                'INFOPLIST_FILE': 'Watch/Info.plist'}),
+    ])
+    write_plist(root, 'App/App.entitlements', icloud('iCloud.com.x'))
+    write_plist(root, 'Watch/Watch.entitlements', icloud(*watch_containers))
+    write_plist(root, 'Watch/Info.plist', {'WKCompanionAppBundleIdentifier': companion})
+
+
+def failures(results):
+    return {name: message for name, passed, message in results if not passed}
+
+
+def test_watch_app_role_comes_from_sdk(tmp_path):
+    app_and_watch(tmp_path, ['iCloud.com.x'])
+
+    results, errors, _ = check_project(tmp_path)
+
+    assert errors == []
+    assert failures(results) == {}
+    names = [name for name, _, _ in results]
+    assert "App (Debug) has CloudKit entitlements" in names
+    assert "Watch (Debug) has CloudKit entitlements" not in names
+    assert "Watch (Debug) matches app iCloud setup" in names
+    assert "Watch (Debug) companion bundle ID" in names
+
+
+def test_watch_container_mismatch_fails(tmp_path):
+    app_and_watch(tmp_path, ['iCloud.com.OTHER'])
+
+    results, _, _ = check_project(tmp_path)
+
+    assert failures(results) == {
+        "Watch (Debug) matches app iCloud setup": "containers not used by the app: iCloud.com.OTHER",
+    }
+
+
+def test_watch_companion_must_name_the_app(tmp_path):
+    app_and_watch(tmp_path, ['iCloud.com.x'], companion='com.x.other')
+
+    results, _, _ = check_project(tmp_path)
+
+    assert failures(results) == {
+        "Watch (Debug) companion bundle ID": "com.x.other (apps are com.x.app)",
+    }
+
+
+def test_widget_detected_from_extension_point(tmp_path):
+    write_project(tmp_path, [
+        ('App', APPLICATION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app',
+                              'CODE_SIGN_ENTITLEMENTS': 'App.entitlements'}),
+        ('Glance', APP_EXTENSION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app.glance',
+                                   'CODE_SIGN_ENTITLEMENTS': 'Glance.entitlements',
+                                   'INFOPLIST_FILE': 'Glance-Info.plist'}),
+        ('WidgetTools', APP_EXTENSION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app.tools',
+                                        'INFOPLIST_FILE': 'Tools-Info.plist'}),
+    ])
+    write_plist(tmp_path, 'App.entitlements', icloud('iCloud.com.x'))
+    write_plist(tmp_path, 'Glance.entitlements', icloud('iCloud.com.glance'))
+    write_plist(tmp_path, 'Glance-Info.plist', WIDGET_INFO)
+    write_plist(tmp_path, 'Tools-Info.plist',
+                {'NSExtension': {'NSExtensionPointIdentifier': 'com.apple.share-services'}})
+
+    results, _, _ = check_project(tmp_path)
+
+    assert failures(results) == {
+        "Glance (Debug) matches app iCloud setup": "containers not used by the app: iCloud.com.glance",
+    }
+
+
+def test_each_host_app_is_compared_separately(tmp_path):
+    write_project(tmp_path, [
+        ('App', APPLICATION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.app',
+                              'CODE_SIGN_ENTITLEMENTS': 'App.entitlements'}),
+        ('Lite', APPLICATION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.lite',
+                               'CODE_SIGN_ENTITLEMENTS': 'Lite.entitlements'}),
+        ('LiteWidget', APP_EXTENSION, {'PRODUCT_BUNDLE_IDENTIFIER': 'com.x.lite.widget',
+                                       'CODE_SIGN_ENTITLEMENTS': 'Lite.entitlements',
+                                       'INFOPLIST_FILE': 'Widget-Info.plist'}),
+    ])
+    write_plist(tmp_path, 'App.entitlements', icloud('iCloud.com.x'))
+    write_plist(tmp_path, 'Lite.entitlements', icloud('iCloud.com.lite'))
+    write_plist(tmp_path, 'Widget-Info.plist', WIDGET_INFO)
+
+    results, _, _ = check_project(tmp_path)
+
+    # The widget shares the Lite app's container, not the later-listed App's
+    assert failures(results) == {}
+    assert "LiteWidget (Debug) matches app iCloud setup" in [name for name, _, _ in results]
+
+
+def test_plist_cache_reads_each_file_once(tmp_path):
+    write_project(tmp_path, [
+        (name, APPLICATION, {'PRODUCT_BUNDLE_IDENTIFIER': f'com.x.{name.lower()}',
+                             'CODE_SIGN_ENTITLEMENTS': path})
+        for name, path in (('A', 'Shared.entitlements'), ('B', 'Shared.entitlements'),
+                           ('C', 'Copy.entitlements'))
+    ])
+    write_plist(tmp_path, 'Shared.entitlements', icloud('iCloud.com.x'))
+    write_plist(tmp_path, 'Copy.entitlements', icloud('iCloud.com.x'))
+
+    _, errors, cache = check_project(tmp_path)
+
+    assert errors == []
+    assert cache.reads == 2
+    assert len(cache._by_digest) == 1
+
+
+def test_plist_cache_reports_unreadable_files(tmp_path):
+    (tmp_path / 'list.plist').write_bytes(plistlib.dumps(['not', 'a', 'dict']))
+    cache = PlistCache(tmp_path)
+
+    assert cache.load('list.plist') == (None, "list.plist is not a dictionary plist")
+    value, error = cache.load('missing.plist')
+    assert value is None and error.startswith("Cannot read missing.plist")
+    assert cache.reads == 1
+
+
+def make_config(configuration, entitlements, target='App'):
+    config = TargetConfig(target, APPLICATION, configuration, {'TEAM': 'ABC'})
+    config.entitlements = entitlements
+    return config
+
+
+def test_ubiquity_containers_must_be_icloud_containers():
+    config = make_config('Debug', {ICLOUD_CONTAINERS: ['iCloud.$(TEAM).x'],
+                                   UBIQUITY_CONTAINERS: ['iCloud.ABC.x', 'iCloud.ABC.docs']})
+
+    assert list(rule_ubiquity_subset([config])) == [
+        ("App (Debug) ubiquity containers declared as iCloud containers", False,
+         f"Not in {ICLOUD_CONTAINERS}: iCloud.ABC.docs"),
+    ]
+
+
+def test_configurations_must_agree():
+    configs = [make_config('Debug', icloud('iCloud.com.x')),
+               make_config('Release', icloud('iCloud.com.y'))]
+
+    assert list(rule_configurations_agree(configs)) == [
+        ("App iCloud entitlements identical across configurations", False,
+         "Release differ from Debug"),
+    ]
+
+
+def test_roles_from_settings_and_info():
+    settings = {'SDKROOT': 'auto', 'SUPPORTED_PLATFORMS': 'watchos watchsimulator'}
+    assert TargetConfig('W', APPLICATION, 'Debug', settings).role == 'watch'
+    assert TargetConfig('A', APPLICATION, 'Debug', {'SDKROOT': 'iphoneos'}).role == 'app'
+    extension = TargetConfig('E', APP_EXTENSION, 'Debug', {})
+    assert extension.role == 'extension'
+    extension.info = WIDGET_INFO
+    assert extension.role == 'widget'
+
+
+def test_collect_target_configs_keeps_target_order(tmp_path):
+    app_and_watch(tmp_path, ['iCloud.com.x'])
+
+    configs = collect_target_configs(tmp_path)
+
+    assert [(c.target, c.role, c.bundle_id) for c in configs] == [
+        ('App', 'app', 'com.x.app'), ('Watch', 'watch', 'com.x.app.watchkitapp'),
+    ]
@@ -0,0 +1,178 @@
+import json
+import struct
+import zlib
+
+import pytest
+
+from icon_manifest import REQUIREMENTS, IconManifest, device_idioms
+
+GRAY_ALPHA = 4
+RGB = 2
+RGBA = 6
+CHANNELS = {GRAY_ALPHA: 2, RGB: 3, RGBA: 4}
+
+
+def write_png(path, size, color_type):
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    row = b'\0' + b'\x80' * size * CHANNELS[color_type]
+    path.write_bytes(
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, color_type, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(row * size))
+        + chunk(b'IEND', b'')
+    )
+
+
+def make_icon_set(tmp_path, variants, size=16):
+    """variants: [(filename, luminosity or None, color_type)] for one universal icon size."""
+    icon_set = tmp_path / 'AppIcon.appiconset'
+    icon_set.mkdir()
+    images = []
+    for filename, luminosity, color_type in variants:
+        entry = {'idiom': 'universal', 'platform': 'ios', 'size': f'{size}x{size}', 'filename': filename}
+        if luminosity:
+            entry['appearances'] = [{'appearance': 'luminosity', 'value': luminosity}]
+        images.append(entry)
+        write_png(icon_set / filename, size, color_type)
+    (icon_set / 'Contents.json').write_text(json.dumps({'images': images, 'info': {}}))
+    return IconManifest.load(icon_set)
+
+
+def write_icon_set(tmp_path, images, pixels=None):
+    """images: Contents.json entries; pixels: {filename: square size} of the RGB files to write."""
+    icon_set = tmp_path / 'AppIcon.appiconset'
+    icon_set.mkdir()
+    for filename, size in (pixels or {}).items():
+        write_png(icon_set / filename, size, RGB)
+    (icon_set / 'Contents.json').write_text(json.dumps({'images': images, 'info': {}}))
+    return IconManifest.load(icon_set)
+
+
+def iphone_entries(filled=lambda size, scale: True):
+    """Every Xcode 13 iPhone slot plus the marketing icon, named icon-<pixels>.png when filled."""
+    entries = []
+    for idiom in ('iphone', 'ios-marketing'):
+        for size, scale in sorted(REQUIREMENTS['xcode13'][idiom]):
+            entry = {'idiom': idiom, 'size': size, 'scale': scale}
+            if filled(size, scale):
+                pixels = round(float(size.split('x')[0]) * int(scale[0]))
+                entry['filename'] = f'icon-{pixels}.png'
+            entries.append(entry)
+    return entries
+
+
+def test_dark_and_tinted_variants_skip_alpha_and_grayscale_rules(tmp_path):
+    manifest = make_icon_set(tmp_path, [
+        ('Icon.png', None, RGB),
+        ('Dark.png', 'dark', RGBA),
+        ('Tinted.png', 'tinted', GRAY_ALPHA),
+    ])
+
+    assert [slot.luminosity for slot in manifest.slots] == [None, 'dark', 'tinted']
+    assert {name: manifest.check_file(name) for name in manifest.files()} == {
+        'Icon.png': [], 'Dark.png': [], 'Tinted.png': [],
+    }
+
+
+def test_default_appearance_still_rejects_alpha_and_grayscale(tmp_path):
+    manifest = make_icon_set(tmp_path, [('Icon.png', None, GRAY_ALPHA)])
+
+    assert manifest.check_file('Icon.png') == [
+        "Has transparency/alpha channel (not allowed)",
+        "Grayscale image (should be RGB)",
+    ]
+
+
+def test_marketing_icon_is_the_default_appearance(tmp_path):
+    manifest = make_icon_set(tmp_path, [
+        ('Dark.png', 'dark', RGBA),
+        ('Icon.png', None, RGB),
+    ], size=1024)
+
+    assert manifest.marketing_slot().filename == 'Icon.png'
+
+
+def test_slots_listed_without_a_file_are_missing(tmp_path):
+    manifest = write_icon_set(tmp_path, iphone_entries(lambda size, scale: size == '60x60'))
+
+    assert manifest.required_idioms() == {'iphone', 'ios-marketing'}
+    assert manifest.missing_slots() == [
+        ('ios-marketing', '1024x1024', '1x'),
+        ('iphone', '20x20', '2x'), ('iphone', '20x20', '3x'),
+        ('iphone', '29x29', '2x'), ('iphone', '29x29', '3x'),
+        ('iphone', '40x40', '2x'), ('iphone', '40x40', '3x'),
+    ]
+
+
+def test_idiom_with_no_files_at_all_is_still_required(tmp_path):
+    empty_ipad = [{'idiom': 'ipad', 'size': size, 'scale': scale}
+                  for size, scale in sorted(REQUIREMENTS['xcode13']['ipad'])]
+    manifest = write_icon_set(tmp_path, iphone_entries() + empty_ipad)
+
+    assert 'ipad' in manifest.required_idioms()
+    assert manifest.missing_slots() == manifest.required_slots({'ipad'})
+
+
+def test_targeted_device_family_requires_idioms_the_set_lacks(tmp_path):
+    manifest = write_icon_set(tmp_path, iphone_entries())
+    assert manifest.missing_slots() == []
+
+    idioms = manifest.required_idioms(device_idioms({'TARGETED_DEVICE_FAMILY': '1,2', 'SDKROOT': 'iphoneos'}))
+
+    assert idioms == {'iphone', 'ipad', 'ios-marketing'}
+    missing = manifest.missing_slots(idioms)
+    assert {idiom for idiom, _, _ in missing} == {'ipad'}
+    assert len(missing) == len(REQUIREMENTS['xcode13']['ipad'])
+
+
+@pytest.mark.parametrize('settings, idioms', [
+    ({'TARGETED_DEVICE_FAMILY': '1', 'SDKROOT': 'iphoneos'}, {'iphone'}),
+    ({'TARGETED_DEVICE_FAMILY': '1,2,6', 'SDKROOT': 'iphoneos'}, {'iphone', 'ipad', 'mac'}),
+    ({'TARGETED_DEVICE_FAMILY': '4', 'SDKROOT': 'watchos'}, {'watch'}),
+    ({'SDKROOT': 'macosx'}, {'mac'}),
+    ({}, set()),
+])
+def test_device_idioms(settings, idioms):
+    assert device_idioms(settings) == idioms
+
+
+def test_file_size_must_match_size_times_scale(tmp_path):
+    manifest = write_icon_set(tmp_path, [
+        {'idiom': 'iphone', 'size': '20x20', 'scale': '3x', 'filename': 'good.png'},
+        {'idiom': 'ipad', 'size': '83.5x83.5', 'scale': '2x', 'filename': 'fraction.png'},
+        {'idiom': 'iphone', 'size': '20x20', 'scale': '2x', 'filename': 'small.png'},
+        {'idiom': 'iphone', 'size': '40x40', 'scale': '2x', 'filename': 'shared.png'},
+        {'idiom': 'iphone', 'size': '40x40', 'scale': '3x', 'filename': 'shared.png'},
+    ], {'good.png': 60, 'fraction.png': 167, 'small.png': 20, 'shared.png': 80})
+
+    assert manifest.check_file('good.png') == []
+    assert manifest.check_file('fraction.png') == []
+    assert manifest.check_file('small.png') == ["Wrong size: 20x20 (expected 40x40)"]
+    assert manifest.check_file('shared.png') == ["Used for slots of different sizes: 80x80, 120x120"]
+
+
+def test_single_size_layout(tmp_path):
+    icon = {'idiom': 'universal', 'platform': 'ios', 'size': '1024x1024'}
+    iphone_and_ipad = device_idioms({'TARGETED_DEVICE_FAMILY': '1,2'})
+
+    manifest = write_icon_set(tmp_path, [{**icon, 'filename': 'Icon.png'}], {'Icon.png': 1024})
+
+    assert manifest.version == 'single-size'
+    assert manifest.required_idioms(iphone_and_ipad) == {'universal'}
+    assert manifest.required_slots(manifest.required_idioms(iphone_and_ipad)) == [
+        ('universal', '1024x1024', None),
+    ]
+    assert manifest.missing_slots() == []
+    assert manifest.check_file('Icon.png') == []
+    assert manifest.marketing_slot().filename == 'Icon.png'
+    # Mac Catalyst still needs the per-size mac icons
+    missing = manifest.missing_slots(manifest.required_idioms(iphone_and_ipad | {'mac'}))
+    assert {idiom for idiom, _, _ in missing} == {'mac'}
+
+
+def test_single_size_icon_without_a_file_is_missing(tmp_path):
+    manifest = write_icon_set(tmp_path, [{'idiom': 'universal', 'platform': 'ios', 'size': '1024x1024'}])
+
+    assert manifest.missing_slots() == [('universal', '1024x1024', None)]
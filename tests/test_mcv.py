@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import mcv
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def test_help_imports_no_subcommand():
+    modules = sorted(module for module, _ in mcv.COMMANDS.values())
+    script = textwrap.dedent(f"""
+        import sys
+        import mcv
+        mcv.main(['--help'])
+        print([m for m in {modules!r} if m in sys.modules])
+    """)
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.splitlines()[-1] == '[]'
+
+
+def test_subcommand_is_imported_only_when_invoked(tmp_path, monkeypatch):
+    (tmp_path / 'fake_tool.py').write_text(textwrap.dedent("""
+        import sys
+        calls = []
+        def main(argv):
+            calls.append((sys.argv[0], argv))
+            return 3
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'argv', ['mcv'])
+    monkeypatch.setitem(mcv.COMMANDS, 'fake', ('fake_tool', "A fake tool"))
+    monkeypatch.delitem(sys.modules, 'fake_tool', raising=False)
+
+    assert mcv.main(['--help']) == 0
+    assert 'fake_tool' not in sys.modules
+
+    assert mcv.main(['fake', '--flag', 'value']) == 3
+    assert sys.modules['fake_tool'].calls == [('mcv fake', ['--flag', 'value'])]
+    monkeypatch.delitem(sys.modules, 'fake_tool')
+
+
+def test_unknown_command_is_rejected(capsys):
+    assert mcv.main(['nonsense']) == 2
+    assert "unknown command 'nonsense'" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+import pbxproj
+from pbxproj_index import ProjectIndex
+
+PROJECT = Path(__file__).resolve().parent.parent / 'MCVenture.xcodeproj' / 'project.pbxproj'
+
+
+def write(tmp_path, project):
+    path = tmp_path / 'project.pbxproj'
+    pbxproj.dump(project, path)
+    return path
+
+
+def test_matches_full_parse_of_repo_project():
+    project = pbxproj.load(PROJECT)
+    objects = project['objects']
+
+    with ProjectIndex(PROJECT) as index:
+        assert len(index) == len(objects)
+        assert sorted(index.ids()) == sorted(objects)
+        assert index.root_object_id == project['rootObject']
+        for object_id, fields in objects.items():
+            record = index[object_id]
+            assert record.fields == fields
+            assert record.isa == fields['isa'] == index.isa_of(object_id)
+
+
+def test_unsorted_sections_and_odd_ids(tmp_path):
+    # pbxproj.dump writes one sorted section per isa; IDs here sort against
+    # the section order, so the table holds several runs to merge
+    objects = {
+        'FFFFFFFFFFFFFFFFFFFFFFF1': {'isa': 'PBXBuildFile', 'fileRef': 'AAAAAAAAAAAAAAAAAAAAAAA2'},
+        '000000000000000000000001': {'isa': 'PBXBuildFile', 'fileRef': 'AAAAAAAAAAAAAAAAAAAAAAA1'},
+        'AAAAAAAAAAAAAAAAAAAAAAA1': {'isa': 'PBXFileReference', 'path': 'A.swift'},
+        'AAAAAAAAAAAAAAAAAAAAAAA2': {'isa': 'PBXFileReference', 'path': 'B.swift'},
+        'ZZZZZZZZZZZZZZZZZZZZZZZ0': {'isa': 'PBXGroup', 'children': [
+            'AAAAAAAAAAAAAAAAAAAAAAA1', 'AAAAAAAAAAAAAAAAAAAAAAA2', 'SHORT1']},
+        '111111111111111111111110': {'isa': 'PBXProject', 'mainGroup': 'ZZZZZZZZZZZZZZZZZZZZZZZ0'},
+        # Hand-edited projects sometimes use IDs of other widths
+        'SHORT1': {'isa': 'PBXFileReference', 'path': 'C.swift'},
+        'A-MUCH-LONGER-IDENTIFIER-THAN-24': {'isa': 'PBXGroup', 'children': []},
+    }
+    path = write(tmp_path, {'archiveVersion': '1', 'objectVersion': '56',
+                            'rootObject': '111111111111111111111110', 'objects': objects})
+
+    with ProjectIndex(path) as index:
+        assert len(index) == len(objects)
+        assert sorted(index.ids()) == sorted(objects)
+        for object_id, fields in objects.items():
+            assert index[object_id].fields == fields
+        assert index.get('SHORT1').get('path') == 'C.swift'
+        assert 'A-MUCH-LONGER-IDENTIFIER-THAN-24' in index
+        assert 'BBBBBBBBBBBBBBBBBBBBBBB1' not in index
+        assert index.get('BBBBBBBBBBBBBBBBBBBBBBB1') is None
+        with pytest.raises(KeyError):
+            index['BBBBBBBBBBBBBBBBBBBBBBB1']
+        assert index.root.get('mainGroup') == 'ZZZZZZZZZZZZZZZZZZZZZZZ0'
+
+
+def test_ids_and_isa_of(tmp_path):
+    objects = {
+        'AAAAAAAAAAAAAAAAAAAAAAA1': {'isa': 'PBXFileReference', 'path': 'A.swift'},
+        'AAAAAAAAAAAAAAAAAAAAAAA2': {'isa': 'PBXFileReference', 'path': 'B.swift'},
+        'SHORT1': {'isa': 'PBXFileReference', 'path': 'C.swift'},
+        'CCCCCCCCCCCCCCCCCCCCCCC1': {'isa': 'PBXGroup', 'children': []},
+        'DDDDDDDDDDDDDDDDDDDDDDD1': {'isa': 'PBXProject', 'mainGroup': 'CCCCCCCCCCCCCCCCCCCCCCC1'},
+    }
+    path = write(tmp_path, {'archiveVersion': '1', 'objectVersion': '56',
+                            'rootObject': 'DDDDDDDDDDDDDDDDDDDDDDD1', 'objects': objects})
+
+    with ProjectIndex(path) as index:
+        assert sorted(index.ids('PBXFileReference')) == [
+            'AAAAAAAAAAAAAAAAAAAAAAA1', 'AAAAAAAAAAAAAAAAAAAAAAA2', 'SHORT1',
+        ]
+        assert list(index.ids('PBXNativeTarget')) == []
+        assert index.isa_of('CCCCCCCCCCCCCCCCCCCCCCC1') == 'PBXGroup'
+        assert index.isa_of('SHORT1') == 'PBXFileReference'
+        assert index.isa_of('EEEEEEEEEEEEEEEEEEEEEEE1') is None
+        # isa_of and ids never materialize objects
+        assert index._records == {}
+        assert [r.id for r in index.objects('PBXGroup')] == ['CCCCCCCCCCCCCCCCCCCCCCC1']
+
+
+def test_missing_root_object(tmp_path):
+    path = write(tmp_path, {'archiveVersion': '1', 'objects': {
+        'AAAAAAAAAAAAAAAAAAAAAAA1': {'isa': 'PBXFileReference', 'path': 'A.swift'},
+    }})
+
+    with ProjectIndex(path) as index:
+        with pytest.raises(pbxproj.PBXParseError, match="No rootObject"):
+            index.root
+
+
+@pytest.mark.parametrize('text', ['', '// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n}\n'])
+def test_unparseable_files(tmp_path, text):
+    path = tmp_path / 'project.pbxproj'
+    path.write_text(text)
+
+    with pytest.raises(pbxproj.PBXParseError):
+        ProjectIndex(path)
@@ -0,0 +1,136 @@
+import copy
+
+from pbxproj_merge import merge
+
+GROUP = 'AAAAAAAAAAAAAAAAAAAAAAA1'
+PHASE = 'AAAAAAAAAAAAAAAAAAAAAAA2'
+ROOT = 'AAAAAAAAAAAAAAAAAAAAAAA0'
+FILE_A = 'BBBBBBBBBBBBBBBBBBBBBBB1'
+FILE_B = 'BBBBBBBBBBBBBBBBBBBBBBB2'
+FILE_C = 'BBBBBBBBBBBBBBBBBBBBBBB3'
+BUILD_A = 'CCCCCCCCCCCCCCCCCCCCCCC1'
+BUILD_B = 'CCCCCCCCCCCCCCCCCCCCCCC2'
+
+
+def make_base():
+    return {
+        'archiveVersion': '1',
+        'objectVersion': '77',
+        'rootObject': ROOT,
+        'objects': {
+            ROOT: {'isa': 'PBXProject', 'mainGroup': GROUP},
+            GROUP: {'isa': 'PBXGroup', 'children': [FILE_A, FILE_B], 'sourceTree': '<group>'},
+            PHASE: {'isa': 'PBXSourcesBuildPhase', 'files': [BUILD_A]},
+            FILE_A: {'isa': 'PBXFileReference', 'path': 'A.swift', 'sourceTree': '<group>'},
+            FILE_B: {'isa': 'PBXFileReference', 'path': 'B.swift', 'sourceTree': '<group>'},
+            BUILD_A: {'isa': 'PBXBuildFile', 'fileRef': FILE_A},
+        },
+    }
+
+
+def add_file(project, file_id, name, after=None):
+    objects = project['objects']
+    objects[file_id] = {'isa': 'PBXFileReference', 'path': name, 'sourceTree': '<group>'}
+    children = objects[GROUP]['children']
+    children.insert(children.index(after) + 1 if after else len(children), file_id)
+
+
+def test_disjoint_inserts_are_both_kept():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    add_file(ours, FILE_C, 'C.swift')
+    add_file(theirs, 'BBBBBBBBBBBBBBBBBBBBBBB4', 'D.swift', after=FILE_A)
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert conflicts == []
+    assert merged['objects'][GROUP]['children'] == [
+        FILE_A, 'BBBBBBBBBBBBBBBBBBBBBBB4', FILE_B, FILE_C,
+    ]
+    assert FILE_C in merged['objects'] and 'BBBBBBBBBBBBBBBBBBBBBBB4' in merged['objects']
+
+
+def test_same_key_changed_differently_conflicts():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    ours['objects'][FILE_A]['path'] = 'Ours.swift'
+    theirs['objects'][FILE_A]['path'] = 'Theirs.swift'
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert len(conflicts) == 1
+    assert conflicts[0].startswith(f"objects/{FILE_A}/path:")
+    assert merged['objects'][FILE_A]['path'] == 'Ours.swift'
+
+
+def test_same_change_on_both_sides_is_not_a_conflict():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    ours['objects'][FILE_A]['path'] = 'Renamed.swift'
+    theirs['objects'][FILE_A]['path'] = 'Renamed.swift'
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert conflicts == []
+    assert merged['objects'][FILE_A]['path'] == 'Renamed.swift'
+
+
+def test_insert_next_to_anchor_removed_by_other_side():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    # ours drops B from the group (but keeps the object), theirs inserts C after B
+    ours['objects'][GROUP]['children'].remove(FILE_B)
+    add_file(theirs, FILE_C, 'C.swift', after=FILE_B)
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert conflicts == []
+    assert merged['objects'][GROUP]['children'] == [FILE_A, FILE_C]
+
+
+def test_delete_versus_use_reports_dangling_reference():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    # ours deletes B and every use of it
+    del ours['objects'][FILE_B]
+    ours['objects'][GROUP]['children'].remove(FILE_B)
+    # theirs starts compiling B
+    theirs['objects'][BUILD_B] = {'isa': 'PBXBuildFile', 'fileRef': FILE_B}
+    theirs['objects'][PHASE]['files'].append(BUILD_B)
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert FILE_B not in merged['objects']
+    assert merged['objects'][BUILD_B]['fileRef'] == FILE_B
+    assert conflicts == [
+        f"objects/{BUILD_B}/fileRef: references {FILE_B}, which the other side removed",
+    ]
+
+
+def test_clean_delete_on_one_side_is_not_a_conflict():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    del theirs['objects'][FILE_A]
+    del theirs['objects'][BUILD_A]
+    theirs['objects'][GROUP]['children'].remove(FILE_A)
+    theirs['objects'][PHASE]['files'].remove(BUILD_A)
+    add_file(ours, FILE_C, 'C.swift')
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert conflicts == []
+    assert merged['objects'][GROUP]['children'] == [FILE_B, FILE_C]
+    assert merged['objects'][PHASE]['files'] == []
+
+
+def test_reference_already_dangling_on_its_own_side_is_not_reported():
+    base = make_base()
+    ours, theirs = copy.deepcopy(base), copy.deepcopy(base)
+    # ours deletes B but leaves it in the group; theirs touches something else
+    del ours['objects'][FILE_B]
+    theirs['objects'][FILE_A]['path'] = 'Renamed.swift'
+
+    merged, conflicts = merge(base, ours, theirs)
+
+    assert conflicts == []
+    assert merged['objects'][GROUP]['children'] == [FILE_A, FILE_B]
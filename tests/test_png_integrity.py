@@ -0,0 +1,143 @@
+import struct
+import zlib
+
+import pytest
+
+from png_integrity import INFLATE_CHUNK, PNG_SIGNATURE, PNGInfo, _check_chunks, verify_png
+
+RGB = 2
+INDEXED = 3
+
+
+def chunk(kind, body=b'', crc=None):
+    if crc is None:
+        crc = zlib.crc32(body, zlib.crc32(kind))
+    return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', crc)
+
+
+def ihdr(width, height, color_type=RGB, interlace=0):
+    return chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, interlace))
+
+
+def raw_rows(width, height, channels=3):
+    return (b'\0' + bytes(i % 256 for i in range(width * channels))) * height
+
+
+def png(*chunks):
+    return PNG_SIGNATURE + b''.join(chunks)
+
+
+def rgb_png(width=4, height=3, data=None):
+    data = raw_rows(width, height) if data is None else data
+    return png(ihdr(width, height), chunk(b'IDAT', zlib.compress(data)), chunk(b'IEND'))
+
+
+def check(data):
+    return _check_chunks(memoryview(data))
+
+
+def test_valid_png_has_no_issues():
+    info, issues = check(rgb_png())
+
+    assert issues == []
+    assert (info.width, info.height, info.color_type) == (4, 3, RGB)
+
+
+def test_idat_split_over_many_chunks_and_inflate_pieces():
+    # More than one INFLATE_CHUNK of output, fed in small IDAT pieces
+    width, height = 512, INFLATE_CHUNK // 512
+    stream = zlib.compress(raw_rows(width, height))
+    pieces = [chunk(b'IDAT', stream[i:i + 1000]) for i in range(0, len(stream), 1000)]
+
+    _, issues = check(png(ihdr(width, height), *pieces, chunk(b'IEND')))
+
+    assert issues == []
+
+
+def test_crc_mismatch_is_reported():
+    data = png(ihdr(4, 3), chunk(b'IDAT', zlib.compress(raw_rows(4, 3)), crc=0), chunk(b'IEND'))
+
+    _, issues = check(data)
+
+    assert issues == ["CRC mismatch in IDAT chunk at offset 33"]
+
+
+@pytest.mark.parametrize('cut, message', [
+    (6, "Truncated chunk header at offset 69"),
+    (16, "Chunk b'IDAT' at offset 33 is truncated"),
+])
+def test_truncated_file(tmp_path, cut, message):
+    path = tmp_path / 'cut.png'
+    path.write_bytes(rgb_png()[:-cut])
+
+    assert verify_png(path) == (None, [message])
+
+
+def test_missing_iend():
+    data = png(ihdr(4, 3), chunk(b'IDAT', zlib.compress(raw_rows(4, 3))))
+
+    assert check(data)[1] == ["Missing IEND terminator (file truncated?)"]
+
+
+def test_short_idat_stream():
+    _, issues = check(rgb_png(data=raw_rows(4, 2)))
+
+    assert issues == ["IDAT inflates to 26 bytes (expected 39)"]
+
+
+def test_incomplete_idat_stream():
+    stream = zlib.compress(raw_rows(4, 3))[:-6]
+    data = png(ihdr(4, 3), chunk(b'IDAT', stream), chunk(b'IEND'))
+
+    assert "IDAT stream is incomplete" in check(data)[1]
+
+
+def test_corrupt_idat_stream():
+    data = png(ihdr(4, 3), chunk(b'IDAT', b'not zlib'), chunk(b'IEND'))
+
+    assert check(data)[1][0].startswith("Corrupt IDAT stream:")
+
+
+def test_adam7_expected_size():
+    # 5x3 RGB: passes 1, 2 and 4 hold one pixel, 5 three, 6 two rows of two,
+    # 7 one row of five; pass 3 is empty
+    info = PNGInfo(5, 3, 8, RGB, 1)
+    assert info.expected_data_size() == 4 + 4 + 4 + 10 + 2 * 7 + 16
+
+    data = png(ihdr(5, 3, interlace=1), chunk(b'IDAT', zlib.compress(bytes(52))), chunk(b'IEND'))
+    assert check(data)[1] == []
+
+
+def test_data_after_iend():
+    data = rgb_png() + chunk(b'tEXt', b'Comment\0late')
+
+    assert check(data)[1] == ["Data after IEND at offset 81"]
+
+
+def test_plte_after_idat():
+    data = png(
+        ihdr(4, 3, INDEXED),
+        chunk(b'IDAT', zlib.compress(raw_rows(4, 3, channels=1))),
+        chunk(b'PLTE', bytes(3 * 4)),
+        chunk(b'IEND'),
+    )
+
+    assert check(data)[1] == ["PLTE appears after IDAT"]
+
+
+def test_indexed_without_plte():
+    data = png(ihdr(4, 3, INDEXED), chunk(b'IDAT', zlib.compress(raw_rows(4, 3, channels=1))),
+               chunk(b'IEND'))
+
+    assert check(data)[1] == ["Indexed-color image has no PLTE chunk"]
+
+
+@pytest.mark.parametrize('prefix, message', [
+    (b'\x89PNG\r\n', "File too small (6 bytes)"),
+    (b'GIF89a\0\0\0\0', "Not a PNG file (bad signature)"),
+])
+def test_not_a_png(tmp_path, prefix, message):
+    path = tmp_path / 'bad.png'
+    path.write_bytes(prefix)
+
+    assert verify_png(path) == (None, [message])
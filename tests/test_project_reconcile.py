@@ -0,0 +1,53 @@
+import pbxproj
+from project_reconcile import PROJECT_FILE, reconcile
+
+ROOT = 'AAAAAAAAAAAAAAAAAAAAAAA0'
+GROUP = 'AAAAAAAAAAAAAAAAAAAAAAA1'
+APP_FILE = 'BBBBBBBBBBBBBBBBBBBBBBB1'
+TARGET = 'CCCCCCCCCCCCCCCCCCCCCCC0'
+SOURCES = 'CCCCCCCCCCCCCCCCCCCCCCC1'
+FRAMEWORKS = 'CCCCCCCCCCCCCCCCCCCCCCC2'
+BUILD_APP = 'DDDDDDDDDDDDDDDDDDDDDDD1'
+BUILD_PACKAGE = 'DDDDDDDDDDDDDDDDDDDDDDD2'
+PACKAGE_PRODUCT = 'EEEEEEEEEEEEEEEEEEEEEEE1'
+
+
+def write_project(root):
+    project = {
+        'archiveVersion': '1',
+        'objectVersion': '56',
+        'rootObject': ROOT,
+        'objects': {
+            ROOT: {'isa': 'PBXProject', 'mainGroup': GROUP, 'targets': [TARGET]},
+            GROUP: {'isa': 'PBXGroup', 'children': [APP_FILE], 'sourceTree': '<group>'},
+            APP_FILE: {'isa': 'PBXFileReference', 'path': 'App.swift', 'sourceTree': '<group>'},
+            TARGET: {'isa': 'PBXNativeTarget', 'name': 'MCVenture',
+                     'buildPhases': [SOURCES, FRAMEWORKS]},
+            SOURCES: {'isa': 'PBXSourcesBuildPhase', 'files': [BUILD_APP]},
+            FRAMEWORKS: {'isa': 'PBXFrameworksBuildPhase', 'files': [BUILD_PACKAGE]},
+            BUILD_APP: {'isa': 'PBXBuildFile', 'fileRef': APP_FILE},
+            # Swift package products are linked by productRef, without a fileRef
+            BUILD_PACKAGE: {'isa': 'PBXBuildFile', 'productRef': PACKAGE_PRODUCT},
+            PACKAGE_PRODUCT: {'isa': 'XCSwiftPackageProductDependency', 'productName': 'Charts'},
+        },
+    }
+    path = root / PROJECT_FILE
+    path.parent.mkdir(parents=True)
+    pbxproj.dump(project, path)
+
+
+def test_unreferenced_source_is_unbuilt_next_to_package_product(tmp_path):
+    write_project(tmp_path)
+    (tmp_path / 'App.swift').write_text('')
+    (tmp_path / 'Orphan.swift').write_text('')
+
+    result = reconcile(tmp_path, jobs=2)
+
+    assert result['unbuilt'] == ['Orphan.swift']
+    assert result['missing'] == []
+
+
+def test_missing_reference_is_reported(tmp_path):
+    write_project(tmp_path)
+
+    assert reconcile(tmp_path, jobs=2)['missing'] == ['App.swift']
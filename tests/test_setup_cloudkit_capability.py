@@ -0,0 +1,25 @@
+import plistlib
+
+from setup_cloudkit_capability import verify_entitlements
+
+
+def write_entitlements(root, value):
+    path = root / 'MCVenture' / 'MCVenture.entitlements'
+    path.parent.mkdir()
+    path.write_bytes(plistlib.dumps(value))
+
+
+def test_non_dictionary_plist_is_rejected(tmp_path, capsys):
+    write_entitlements(tmp_path, ['CloudKit'])
+
+    assert verify_entitlements(tmp_path) is False
+    assert "not a dictionary plist" in capsys.readouterr().out
+
+
+def test_cloudkit_entitlements_are_accepted(tmp_path):
+    write_entitlements(tmp_path, {
+        'com.apple.developer.icloud-container-identifiers': ['iCloud.com.example.MCVenture'],
+        'com.apple.developer.icloud-services': ['CloudKit'],
+    })
+
+    assert verify_entitlements(tmp_path) is True
@@ -0,0 +1,70 @@
+import json
+
+import pbxproj
+from build_settings import PROJECT_FILE
+from validate_app_icons import target_idioms, validate_contents_json
+
+
+def write_project(root, targets):
+    """targets: [(name, build settings)], each with a Debug configuration."""
+    ids = (f"{n:024X}" for n in range(1, 1000))
+    root_id, group_id = next(ids), next(ids)
+    objects = {group_id: {'isa': 'PBXGroup', 'children': [], 'sourceTree': '<group>'}}
+    target_ids = []
+    for name, settings in targets:
+        target_id, list_id, config_id = next(ids), next(ids), next(ids)
+        objects[target_id] = {'isa': 'PBXNativeTarget', 'name': name, 'buildConfigurationList': list_id}
+        objects[list_id] = {'isa': 'XCConfigurationList', 'buildConfigurations': [config_id]}
+        objects[config_id] = {'isa': 'XCBuildConfiguration', 'name': 'Debug', 'buildSettings': settings}
+        target_ids.append(target_id)
+    objects[root_id] = {'isa': 'PBXProject', 'mainGroup': group_id, 'targets': target_ids}
+
+    path = root / PROJECT_FILE
+    path.parent.mkdir(parents=True)
+    pbxproj.dump({'archiveVersion': '1', 'objectVersion': '56', 'rootObject': root_id,
+                  'objects': objects}, path)
+
+
+def write_icon_set(path, images):
+    path.mkdir(parents=True)
+    (path / 'Contents.json').write_text(json.dumps({'images': images, 'info': {}}))
+    return path
+
+
+APP = ('App', {'ASSETCATALOG_COMPILER_APPICON_NAME': 'AppIcon',
+               'TARGETED_DEVICE_FAMILY': '1,2', 'SDKROOT': 'iphoneos'})
+WATCH = ('Watch', {'ASSETCATALOG_COMPILER_APPICON_NAME': 'AppIcon',
+                   'TARGETED_DEVICE_FAMILY': '4', 'SDKROOT': 'watchos'})
+
+
+def test_target_idioms_come_from_the_target_owning_the_catalog(tmp_path):
+    write_project(tmp_path, [APP, WATCH])
+
+    app_icons = tmp_path / 'App' / 'Assets.xcassets' / 'AppIcon.appiconset'
+    watch_icons = tmp_path / 'Watch' / 'Assets.xcassets' / 'AppIcon.appiconset'
+
+    assert target_idioms(tmp_path, app_icons) == {'iphone', 'ipad'}
+    assert target_idioms(tmp_path, watch_icons) == {'watch'}
+    # Outside any target directory every target using the name counts
+    assert target_idioms(tmp_path, tmp_path / 'AppIcon.appiconset') == {'iphone', 'ipad', 'watch'}
+    assert target_idioms(tmp_path, tmp_path / 'Other.appiconset') == set()
+
+
+def test_target_idioms_without_a_project_is_empty(tmp_path):
+    assert target_idioms(tmp_path, tmp_path / 'AppIcon.appiconset') == set()
+
+
+def test_iphone_only_icon_set_fails_for_an_iphone_and_ipad_target(tmp_path):
+    write_project(tmp_path, [APP])
+    icon_set = write_icon_set(tmp_path / 'App' / 'Assets.xcassets' / 'AppIcon.appiconset', [
+        {'idiom': 'iphone', 'size': '60x60', 'scale': scale, 'filename': f'icon-60@{scale}.png'}
+        for scale in ('2x', '3x')
+    ])
+
+    _, passed, message = validate_contents_json(icon_set)
+    assert not passed
+    assert 'ipad' not in message
+
+    _, passed, message = validate_contents_json(icon_set, target_idioms(tmp_path, icon_set))
+    assert not passed
+    assert 'ipad 83.5x83.5 @2x' in message
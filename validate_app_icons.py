@@ -8,33 +8,32 @@ This script validates that all app icons meet Apple's requirements:
 - RGB color space
 - PNG format
 - Proper Contents.json configuration
+
+Expected sizes come from each icon set's Contents.json (see icon_manifest.py),
+so any appiconset can be checked: python3 validate_app_icons.py Foo.appiconset
+Required idioms follow TARGETED_DEVICE_FAMILY and SDKROOT of the targets
+whose ASSETCATALOG_COMPILER_APPICON_NAME names the set.
 """
 
 import json
-import subprocess
 import sys
 from pathlib import Path
 
-# ANSI color codes
-GREEN = '\033[92m'
-RED = '\033[91m'
-YELLOW = '\033[93m'
-BLUE = '\033[94m'
-RESET = '\033[0m'
+from mcv_common import (
+    BLUE, GREEN, RED, RESET, YELLOW,
+    make_parser, parse_args, print_banner, print_result,
+    print_header as _print_header,
+)
 
-def print_header(text):
-    print(f"\n{BLUE}{'=' * 70}{RESET}")
-    print(f"{BLUE}{text:^70}{RESET}")
-    print(f"{BLUE}{'=' * 70}{RESET}\n")
+HEADER_WIDTH = 70
 
-def print_result(test_name, passed, message=""):
-    status = f"{GREEN}✅ PASS{RESET}" if passed else f"{RED}❌ FAIL{RESET}"
-    print(f"{status} - {test_name}")
-    if message:
-        print(f"         {message}")
+def print_header(text):
+    _print_header(text, width=HEADER_WIDTH, center=True)
 
 def get_image_info(image_path):
     """Get image properties using sips command"""
+    import subprocess
+
     try:
         result = subprocess.run(
             ['sips', '-g', 'pixelWidth', '-g', 'pixelHeight', '-g', 'hasAlpha', 
@@ -63,146 +62,91 @@ def get_image_info(image_path):
         print(f"{RED}Error reading {image_path}: {e}{RESET}")
         return None
 
-def validate_icon_requirements(icon_path, expected_size):
-    """Validate a single icon meets Apple requirements"""
-    info = get_image_info(icon_path)
-    if not info:
-        return False, "Could not read image"
-    
-    issues = []
-    
-    # Check dimensions
-    if info['width'] != expected_size or info['height'] != expected_size:
-        issues.append(f"Wrong size: {info['width']}x{info['height']} (expected {expected_size}x{expected_size})")
-    
-    # Check alpha channel
-    if info['has_alpha']:
-        issues.append("Has transparency/alpha channel (not allowed)")
-    
-    # Check color space
-    if 'RGB' not in info['color_space']:
-        issues.append(f"Wrong color space: {info['color_space']} (should be RGB)")
-    
-    # Check format
-    if info['format'] != 'png':
-        issues.append(f"Wrong format: {info['format']} (should be png)")
-    
+def validate_icon_requirements(manifest, filename):
+    """Validate a single icon against every Contents.json slot that uses it"""
+    issues = manifest.check_file(filename)
     if issues:
         return False, "; ".join(issues)
-    return True, "All checks passed"
+    slots = ", ".join(slot.label for slot in manifest.slots_for(filename))
+    return True, f"{slots} - all checks passed"
+
+def target_idioms(root, icon_set_path):
+    """Idioms of the targets whose app icon is this set, from their build settings.
+
+    Returns an empty set when the project cannot be read, so Contents.json
+    decides alone.
+    """
+    import pbxproj
+    from build_settings import BuildSettingsResolver
+    from icon_manifest import device_idioms
 
-def validate_contents_json(contents_path):
-    """Validate Contents.json structure"""
     try:
-        with open(contents_path, 'r') as f:
-            contents = json.load(f)
-        
-        # Check required keys
-        if 'images' not in contents:
-            return False, "Missing 'images' key"
-        
-        if 'info' not in contents:
-            return False, "Missing 'info' key"
-        
-        # Check for required sizes
-        required_sizes = {
-            ('iphone', '20x20', '2x'): 40,
-            ('iphone', '20x20', '3x'): 60,
-            ('iphone', '29x29', '2x'): 58,
-            ('iphone', '29x29', '3x'): 87,
-            ('iphone', '40x40', '2x'): 80,
-            ('iphone', '40x40', '3x'): 120,
-            ('iphone', '60x60', '2x'): 120,
-            ('iphone', '60x60', '3x'): 180,
-            ('ios-marketing', '1024x1024', '1x'): 1024,
-        }
-        
-        found_sizes = set()
-        for image in contents['images']:
-            key = (image.get('idiom'), image.get('size'), image.get('scale'))
-            found_sizes.add(key)
-        
-        missing = []
-        for required_key in required_sizes.keys():
-            if required_key not in found_sizes:
-                missing.append(f"{required_key[0]} {required_key[1]} @{required_key[2]}")
-        
-        if missing:
-            return False, f"Missing required sizes: {', '.join(missing)}"
-        
-        return True, f"All {len(required_sizes)} required sizes present"
-    
+        table = BuildSettingsResolver(root).table()
+    except (OSError, pbxproj.PBXParseError):
+        return set()
+    users = {target: configs for target, configs in table.items()
+             if any(settings.get('ASSETCATALOG_COMPILER_APPICON_NAME') == icon_set_path.stem
+                    for settings in configs.values())}
+    # Several targets may call their icon AppIcon; a catalog lives in its target's directory
+    try:
+        owner = icon_set_path.resolve().relative_to(Path(root).resolve()).parts[0]
+    except (ValueError, IndexError):
+        owner = None
+    if owner in users:
+        users = {owner: users[owner]}
+    return {idiom for configs in users.values() for settings in configs.values()
+            for idiom in device_idioms(settings)}
+
+def validate_contents_json(icon_set_path, targeted=None):
+    """Load and validate Contents.json; returns (IconManifest or None, passed, message)"""
+    from icon_manifest import IconManifest
+
+    try:
+        manifest = IconManifest.load(icon_set_path)
     except json.JSONDecodeError as e:
-        return False, f"Invalid JSON: {e}"
+        return None, False, f"Invalid JSON: {e}"
     except Exception as e:
-        return False, f"Error: {e}"
-
-def main():
-    print_header("MCVenture App Icon Compliance Validation")
-    
-    # Locate AppIcon.appiconset
-    icon_set_path = Path('/Users/bntf/Desktop/MCVenture/MCVenture/Assets.xcassets/AppIcon.appiconset')
+        return None, False, f"Error: {e}"
     
-    if not icon_set_path.exists():
-        print(f"{RED}❌ Error: AppIcon.appiconset not found at {icon_set_path}{RESET}")
-        return 1
+    idioms = manifest.required_idioms(targeted)
+    missing = manifest.missing_slots(idioms)
+    if missing:
+        names = [f"{idiom} {size}" + (f" @{scale}" if scale else "") for idiom, size, scale in missing]
+        return manifest, False, f"Missing required sizes: {', '.join(names)}"
     
-    print(f"{GREEN}✓{RESET} Found AppIcon.appiconset at: {icon_set_path}\n")
+    required = len(manifest.required_slots(idioms))
+    return manifest, True, f"All {required} required sizes present ({manifest.version} layout)"
+
+def validate_icon_set(icon_set_path, root=None):
+    """Run every test on one .appiconset; returns True when all passed"""
+    print(f"{GREEN}✓{RESET} Found {icon_set_path.name} at: {icon_set_path}\n")
     
-    # Test 1: Validate Contents.json
+    # Test 1: Validate Contents.json against the devices the targets run on
     print_header("Test 1: Contents.json Structure")
     
-    contents_path = icon_set_path / 'Contents.json'
-    passed, message = validate_contents_json(contents_path)
+    targeted = target_idioms(root, icon_set_path) if root is not None else None
+    manifest, passed, message = validate_contents_json(icon_set_path, targeted)
     print_result("Contents.json structure", passed, message)
     
-    if not passed:
+    if manifest is None:
         print(f"\n{YELLOW}⚠️  Fix Contents.json before continuing{RESET}\n")
-        return 1
+        return False
+    all_passed = passed
     
-    # Test 2: Validate individual icon files
+    # Test 2: Validate each file against the slots that reference it
     print_header("Test 2: Individual Icon Validation")
     
-    # Load Contents.json to get expected sizes
-    with open(contents_path, 'r') as f:
-        contents = json.load(f)
-    
-    all_passed = True
-    size_mapping = {
-        'icon-20.png': 20,
-        'icon-29.png': 29,
-        'icon-40.png': 40,
-        'icon-58.png': 58,
-        'icon-60.png': 60,
-        'icon-76.png': 76,
-        'icon-80.png': 80,
-        'icon-87.png': 87,
-        'icon-120.png': 120,
-        'icon-152.png': 152,
-        'icon-167.png': 167,
-        'icon-180.png': 180,
-        'icon-1024.png': 1024,
-    }
-    
-    for filename, expected_size in size_mapping.items():
-        icon_path = icon_set_path / filename
-        if icon_path.exists():
-            passed, message = validate_icon_requirements(icon_path, expected_size)
-            print_result(filename, passed, message)
-            all_passed = all_passed and passed
-        else:
-            print_result(filename, False, "File not found")
-            all_passed = False
+    for filename in manifest.files():
+        passed, message = validate_icon_requirements(manifest, filename)
+        print_result(filename, passed, message)
+        all_passed = all_passed and passed
     
     # Test 3: Check for extra/unused files
     print_header("Test 3: Clean Directory Check")
     
-    all_files = set(p.name for p in icon_set_path.glob('*') if p.is_file() and p.name != 'Contents.json')
-    expected_files = set(size_mapping.keys())
-    extra_files = all_files - expected_files
-    
+    extra_files = manifest.extra_files()
     if extra_files:
-        print_result("No extra files", False, f"Found: {', '.join(extra_files)}")
+        print_result("No extra files", False, f"Not in Contents.json: {', '.join(extra_files)}")
         all_passed = False
     else:
         print_result("No extra files", True, "Clean directory")
@@ -210,14 +154,18 @@ def main():
     # Test 4: Apple-specific requirements
     print_header("Test 4: Apple App Store Requirements")
     
-    # Check 1024x1024 icon specifically (most important)
-    icon_1024 = icon_set_path / 'icon-1024.png'
-    if icon_1024.exists():
+    # Check the 1024x1024 App Store icon specifically (most important)
+    marketing = manifest.marketing_slot()
+    icon_1024 = icon_set_path / marketing.filename if marketing else None
+    if icon_1024 is None:
+        print_result("App Store icon", False, "No 1024x1024 marketing icon in Contents.json")
+        all_passed = False
+    elif icon_1024.exists():
         info = get_image_info(icon_1024)
         if info:
             checks = [
                 ("Exact 1024x1024 size", info['width'] == 1024 and info['height'] == 1024),
-                ("No alpha/transparency", not info['has_alpha']),
+                ("No alpha/transparency", not info['has_alpha'] or marketing.idiom == 'mac'),
                 ("RGB color space", 'RGB' in info['color_space']),
                 ("PNG format", info['format'] == 'png'),
             ]
@@ -229,20 +177,51 @@ def main():
     # Test 5: File size check (icons shouldn't be too large)
     print_header("Test 5: File Size Optimization")
     
-    icon_1024_size = icon_1024.stat().st_size / 1024  # KB
-    if icon_1024_size > 1024:  # Over 1MB
-        print_result("Icon file size", False, f"{icon_1024_size:.1f} KB (should be < 1 MB)")
-        print(f"         {YELLOW}Consider optimizing to reduce app size{RESET}")
-    else:
-        print_result("Icon file size", True, f"{icon_1024_size:.1f} KB")
+    if icon_1024 is not None and icon_1024.exists():
+        icon_1024_size = icon_1024.stat().st_size / 1024  # KB
+        if icon_1024_size > 1024:  # Over 1MB
+            print_result("Icon file size", False, f"{icon_1024_size:.1f} KB (should be < 1 MB)")
+            print(f"         {YELLOW}Consider optimizing to reduce app size{RESET}")
+        else:
+            print_result("Icon file size", True, f"{icon_1024_size:.1f} KB")
+    
+    # Test 6: Structural integrity (CRCs, chunk order, IDAT size)
+    print_header("Test 6: PNG Integrity")
+    
+    from png_integrity import verify_png
+    
+    for icon_path in sorted(icon_set_path.glob('*.png')):
+        _, issues = verify_png(icon_path)
+        print_result(icon_path.name, not issues, "; ".join(issues) if issues else "Structure intact")
+        all_passed = all_passed and not issues
+    
+    return all_passed
+
+def main(argv=None):
+    parser = make_parser("Validate app icons for App Store compliance")
+    parser.add_argument('icon_sets', nargs='*', metavar='APPICONSET',
+                        help="icon sets to validate (default: the MCVenture AppIcon)")
+    args = parse_args(parser, argv)
+
+    print_header("MCVenture App Icon Compliance Validation")
+    
+    icon_sets = [Path(p) for p in args.icon_sets] or [
+        args.root / 'MCVenture' / 'Assets.xcassets' / 'AppIcon.appiconset'
+    ]
+    
+    all_passed = True
+    for icon_set_path in icon_sets:
+        if not (icon_set_path / 'Contents.json').exists():
+            print(f"{RED}❌ Error: {icon_set_path.name} not found at {icon_set_path}{RESET}")
+            return 1
+        all_passed = validate_icon_set(icon_set_path, args.root) and all_passed
     
     # Final summary
     print_header("Validation Summary")
     
     if all_passed:
-        print(f"{GREEN}{'=' * 70}{RESET}")
-        print(f"{GREEN}🎉 ALL TESTS PASSED - Icons are Apple App Store compliant!{RESET}")
-        print(f"{GREEN}{'=' * 70}{RESET}\n")
+        print_banner("🎉 ALL TESTS PASSED - Icons are Apple App Store compliant!", GREEN, HEADER_WIDTH)
+        print()
         print(f"{BLUE}Your app icons meet all Apple requirements:{RESET}")
         print("  ✅ Correct dimensions for all sizes")
         print("  ✅ No alpha/transparency")
@@ -250,12 +229,12 @@ def main():
         print("  ✅ PNG format")
         print("  ✅ Proper Contents.json configuration")
         print("  ✅ Clean directory structure")
+        print("  ✅ Structurally intact PNG files")
         print("\n✨ Your icons are ready for App Store submission! ✨\n")
         return 0
     else:
-        print(f"{RED}{'=' * 70}{RESET}")
-        print(f"{RED}❌ VALIDATION FAILED - Issues found with icons{RESET}")
-        print(f"{RED}{'=' * 70}{RESET}\n")
+        print_banner("❌ VALIDATION FAILED - Issues found with icons", RED, HEADER_WIDTH)
+        print()
         print(f"{YELLOW}Review the failures above and fix them before submission.{RESET}\n")
         return 1
 